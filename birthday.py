@@ -1,8 +1,9 @@
 from __future__ import annotations
 import threading
 import time
-from datetime import date, datetime
+from datetime import datetime
 from typing import Callable, Dict, Optional, Any
+from fechas import parse_date_any as _parse_date_any
 
 # Tipos
 Persona  = Dict[str, Any]
@@ -16,19 +17,6 @@ def _safe_int(x, default: int = 0) -> int:
     except Exception:
         return default
 
-def _parse_date_any(s: str) -> Optional[date]:
-    """Intenta varios formatos comunes: YYYY-MM-DD, DD/MM/YYYY, DD-MM-YYYY, YYYY/MM/DD."""
-    if not s:
-        return None
-    s = str(s).strip()
-    fmts = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d")
-    for f in fmts:
-        try:
-            return datetime.strptime(s, f).date()
-        except Exception:
-            pass
-    return None
-
 def _append_hist(p: Persona, anio: int, tipo: str, detalle: str = ""):
     if "_hist" not in p or not isinstance(p["_hist"], list):
         p["_hist"] = []
@@ -148,12 +136,9 @@ class BirthdayEngine:
 
             elapsed = time.time() - t0
             rest = max(0.05, self.segundos_por_tick - elapsed)
-            self._sleep_cancellable(rest)
-
-    def _sleep_cancellable(self, secs: float):
-        end = time.time() + secs
-        while time.time() < end and not self._stop_evt.is_set():
-            time.sleep(0.05)
+            # Event.wait bloquea sin sondeo y despierta en cuanto se llama stop()
+            if self._stop_evt.wait(rest):
+                break
 
     # ---- Lógica por tick ----
     def _tick(self):
@@ -178,6 +163,7 @@ class BirthdayEngine:
                     try:
                         self.on_event("cumpleaños", {
                             "cedula": ced,
+                            "nombre": p.get("nombre", "¿?"),
                             "edad": nueva_edad,
                             "detalle": f"{p.get('nombre','(sin nombre)')} cumple {nueva_edad}",
                         })
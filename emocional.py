@@ -2,8 +2,9 @@
 from __future__ import annotations
 import threading
 import time
-from datetime import datetime, date
+from datetime import datetime
 from typing import Callable, Dict, List, Optional, Any
+from fechas import parse_date_any as _parse_date_any
 
 Persona   = Dict[str, Any]
 OnChange  = Optional[Callable[[], None]]
@@ -18,17 +19,6 @@ def _safe_int(x, default: Optional[int] = None) -> Optional[int]:
     except Exception:
         return default
 
-def _parse_date_any(s: str) -> Optional[date]:
-    if not s:
-        return None
-    s = str(s).strip()
-    for f in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d"):
-        try:
-            return datetime.strptime(s, f).date()
-        except Exception:
-            pass
-    return None
-
 def _today_with_year(y: int) -> str:
     """Fecha 'actual' = año de simulación + mes/día del sistema."""
     now = datetime.now()
@@ -210,12 +200,9 @@ class EmotionalHealthEngine:
 
             elapsed = time.time() - t0
             rest = max(0.05, self.segundos_por_tick - elapsed)
-            self._sleep_cancellable(rest)
-
-    def _sleep_cancellable(self, secs: float):
-        end = time.time() + secs
-        while time.time() < end and not self._stop_evt.is_set():
-            time.sleep(0.05)
+            # Event.wait bloquea sin sondeo y despierta en cuanto se llama stop()
+            if self._stop_evt.wait(rest):
+                break
 
     # ---- Lógica por tick (1 “año” sim) ----
     def _tick(self):
@@ -284,6 +271,7 @@ class EmotionalHealthEngine:
             try:
                 self.on_event("salud_baja", {
                     "cedula": ced,
+                    "nombre": p.get("nombre", "¿?"),
                     "nivel": "baja",
                     "valor": int(p.get("salud_emocional", 70)),
                     "detalle": f"{p.get('nombre','¿?')} alcanza {self.years_threshold} años soltero/a",
@@ -314,6 +302,7 @@ class EmotionalHealthEngine:
             try:
                 self.on_event("salud_baja", {
                     "cedula": ced,
+                    "nombre": p.get("nombre", "¿?"),
                     "nivel": "baja",
                     "valor": int(new_val),
                     "detalle": f"Salud emocional cae a {int(new_val)}% tras {years_single} años soltero/a",
@@ -379,11 +368,21 @@ class EmotionalHealthEngine:
                 raw = str(sp.get("falle","") or "")
                 if not _is_dead(sp, year_now):
                     sp["pareja"] = ""
+                    sp["pareja_id"] = ""
                     sp["estado"] = "Viudo/a"
                     try:
                         rec_viudez(pareja_id, _idname(ced, p.get("nombre","")), fecha=f)
                     except Exception:
                         pass
+                    # Evento de viudez (refresca la elegibilidad en Uniones)
+                    if self.on_event:
+                        try:
+                            self.on_event("viudez", {
+                                "cedula": pareja_id,
+                                "nombre": sp.get("nombre","¿?")
+                            })
+                        except Exception:
+                            pass
         except Exception:
             pass
 
@@ -425,6 +424,7 @@ class EmotionalHealthEngine:
             try:
                 self.on_event("salud_mejora", {
                     "cedula": ced,
+                    "nombre": p.get("nombre", "¿?"),
                     "nivel": "recupera",
                     "valor": int(p.get("salud_emocional", 80)),
                     "detalle": f"{p.get('nombre','¿?')} sale de soltería",
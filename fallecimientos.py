@@ -3,8 +3,9 @@ from __future__ import annotations
 import threading
 import time
 import random
-from datetime import datetime, date
+from datetime import datetime
 from typing import Callable, Dict, List, Optional, Any, Tuple
+from fechas import parse_date_any as _parse_date_any
 
 Persona   = Dict[str, Any]
 OnChange  = Optional[Callable[[], None]]
@@ -19,17 +20,6 @@ def _safe_int(x, default: int = 0) -> int:
     except Exception:
         return default
 
-def _parse_date_any(s: str) -> Optional[date]:
-    if not s:
-        return None
-    s = str(s).strip()
-    for f in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d"):
-        try:
-            return datetime.strptime(s, f).date()
-        except Exception:
-            pass
-    return None
-
 def _today_real() -> str:
     return datetime.now().strftime("%Y-%m-%d")
 
@@ -150,12 +140,9 @@ class DeathEngine:
 
             elapsed = time.time() - t0
             rest = max(0.05, self.segundos_por_tick - elapsed)
-            self._sleep_cancellable(rest)
-
-    def _sleep_cancellable(self, secs: float):
-        end = time.time() + secs
-        while time.time() < end and not self._stop_evt.is_set():
-            time.sleep(0.05)
+            # Event.wait bloquea sin sondeo y despierta en cuanto se llama stop()
+            if self._stop_evt.wait(rest):
+                break
 
     # ---- Lógica por tick ----
     def _tick(self):
@@ -282,6 +269,7 @@ class DeathEngine:
             raw = str(sp.get("falle","") or "")
             if not _is_dead_value(raw, y):
                 sp["pareja"] = ""
+                sp["pareja_id"] = ""
                 sp["estado"] = "Viudo/a"
                 _append_hist(sp, y, "viudez", f"Viudez por fallecimiento de {p.get('nombre','')}")
                 if self.on_event:
@@ -342,6 +330,7 @@ class DeathEngine:
                     try:
                         self.on_event("tutoria", {
                             "cedula": hid,
+                            "nombre": h.get("nombre", "¿?"),
                             "detalle": f"Tutor legal asignado: {tp.get('nombre','')}"
                         })
                     except Exception:
@@ -0,0 +1,39 @@
+# fechas.py
+# -*- coding: utf-8 -*-
+"""
+Parseo de fechas compartido por los motores de simulación
+(cumpleaños, nacimientos, fallecimientos, uniones y salud emocional).
+
+Formatos aceptados: YYYY-MM-DD, DD/MM/YYYY, DD-MM-YYYY, YYYY/MM/DD.
+"""
+from __future__ import annotations
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional
+
+@lru_cache(maxsize=4096)
+def parse_date_any(s: str) -> Optional[date]:
+    """Intenta varios formatos comunes: YYYY-MM-DD, DD/MM/YYYY, DD-MM-YYYY, YYYY/MM/DD."""
+    if not s:
+        return None
+    s = str(s).strip()
+    # Camino rápido: los 4 formatos de 10 caracteres sin strptime ni excepciones
+    if len(s) == 10:
+        sep = s[4]
+        if sep in "-/" and s[7] == sep:
+            y, m, d = s[:4], s[5:7], s[8:]
+        elif s[2] in "-/" and s[5] == s[2]:
+            d, m, y = s[:2], s[3:5], s[6:]
+        else:
+            y = m = d = ""
+        if y.isdigit() and m.isdigit() and d.isdigit():
+            try:
+                return date(int(y), int(m), int(d))
+            except ValueError:
+                return None
+    for f in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d"):
+        try:
+            return datetime.strptime(s, f).date()
+        except Exception:
+            pass
+    return None
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from collections import defaultdict
-from typing import Dict, Set, Tuple, Iterable
+from typing import Dict, Set, Tuple, Iterable, NamedTuple
 
 # ------------------ Utilidades ------------------
 
@@ -13,6 +13,18 @@ def _ced_from_combo(value: str) -> str:
 
 # ------------------ Núcleo ------------------
 
+class KinRecord(NamedTuple):
+    """Parentescos ya resueltos de una persona (ver `Kinship.precompute_all`)."""
+    children: Set[str]
+    spouse: str
+    full_siblings: Set[str]
+    half_siblings: Set[str]
+    grandparents: Set[str]
+    grandchildren: Set[str]
+    uncles_aunts: Set[str]  # con políticos incluidos
+    cousins: Set[str]
+    nieces_nephews: Set[str]
+
 class Kinship:
     """Calcula y expone consultas de parentesco sobre un set de personas.
 
@@ -178,6 +190,62 @@ class Kinship:
             res |= self.get_children(sib)
         return res
 
+    # ---------- Lote ----------
+
+    def precompute_all(self, ceds: Iterable[str]) -> Dict[str, KinRecord]:
+        """Resuelve todos los parentescos de `ceds` de una vez.
+        Mismos resultados que las consultas sueltas, pero los hermanos de cada
+        persona (propia, padres, tíos) se calculan una sola vez para todo el lote.
+        """
+        sibs_memo: Dict[str, Tuple[Set[str], Set[str]]] = {}
+
+        def sibs(c: str) -> Tuple[Set[str], Set[str]]:
+            r = sibs_memo.get(c)
+            if r is None:
+                r = sibs_memo[c] = (self.full_siblings(c), self.half_siblings(c))
+            return r
+
+        def kids_of(group: Iterable[str]) -> Set[str]:
+            res: Set[str] = set()
+            for x in group:
+                res |= self.children.get(x, set())
+            return res
+
+        out: Dict[str, KinRecord] = {}
+        for ced in ceds:
+            padre, madre = self.get_parents(ced)
+            full, half = sibs(ced)
+            children = self.get_children(ced)
+
+            grandparents: Set[str] = set()
+            for parent in (padre, madre):
+                if parent:
+                    grandparents |= set(self.get_parents(parent)) - {""}
+
+            # Tíos consanguíneos = hermanos (completos o medios) de los padres
+            blood: Set[str] = set()
+            for parent in (padre, madre):
+                if parent:
+                    pf, ph = sibs(parent)
+                    blood |= pf | ph
+            uncles = blood | {sp for sp in map(self.get_spouse, blood) if sp}
+            for s in (blood, uncles):
+                s.discard(padre)
+                s.discard(madre)
+
+            out[ced] = KinRecord(
+                children=children,
+                spouse=self.get_spouse(ced),
+                full_siblings=full,
+                half_siblings=half,
+                grandparents=grandparents,
+                grandchildren=kids_of(children),
+                uncles_aunts=uncles,
+                cousins=kids_of(blood),
+                nieces_nephews=kids_of(full | half),
+            )
+        return out
+
     # ---------- Etiquetador simple ----------
 
     def relation_label(self, a: str, b: str) -> str:
@@ -236,4 +304,4 @@ class Kinship:
         return "; ".join(f"{c} - {self.name_of(c)}" for c in sorted(set(ceds)))
 
 
-__all__ = ["Kinship"]
+__all__ = ["Kinship", "KinRecord"]
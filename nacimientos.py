@@ -3,8 +3,10 @@ from __future__ import annotations
 import threading
 import time
 import random
-from datetime import datetime, date
-from typing import Callable, Dict, List, Optional, Any, Tuple
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, List, Optional, Any, Tuple
+from fechas import parse_date_any as _parse_date_any
 
 Persona   = Dict[str, Any]
 OnChange  = Optional[Callable[[], None]]
@@ -19,17 +21,6 @@ def _safe_int(x, default: Optional[int] = 0) -> Optional[int]:
     except Exception:
         return default
 
-def _parse_date_any(s: str) -> Optional[date]:
-    if not s:
-        return None
-    s = str(s).strip()
-    for f in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d"):
-        try:
-            return datetime.strptime(s, f).date()
-        except Exception:
-            pass
-    return None
-
 def _today_real() -> str:
     return datetime.now().strftime("%Y-%m-%d")
 
@@ -81,6 +72,17 @@ def _list_from_csv(val: Any) -> List[str]:
         return [str(x).strip().lower() for x in val if str(x).strip()]
     return [x.strip().lower() for x in str(val).split(",") if x.strip()]
 
+def _affinity_set(p: Persona) -> FrozenSet[str]:
+    """Afinidades de la persona como frozenset (cacheado por el texto: si cambia, se recalcula)."""
+    val = p.get("afinidades") or p.get("intereses")
+    if isinstance(val, list):
+        return frozenset(_list_from_csv(val))
+    return _affinity_set_str(str(val) if val else "")
+
+@lru_cache(maxsize=4096)
+def _affinity_set_str(text: str) -> FrozenSet[str]:
+    return frozenset(_list_from_csv(text))
+
 def _compute_compatibility(a: Persona, b: Persona) -> float:
     """
     Índice 0..1:
@@ -88,8 +90,8 @@ def _compute_compatibility(a: Persona, b: Persona) -> float:
       - Bonificación cercanía de edad (0.1)
       - Bonificación misma provincia (0.1)
     """
-    A = set(_list_from_csv(a.get("afinidades") or a.get("intereses")))
-    B = set(_list_from_csv(b.get("afinidades") or b.get("intereses")))
+    A = _affinity_set(a)
+    B = _affinity_set(b)
     if A or B:
         inter = len(A & B)
         union = max(1, len(A | B))
@@ -240,12 +242,9 @@ class BirthEngine:
 
             elapsed = time.time() - t0
             rest = max(0.05, self.segundos_por_tick - elapsed)
-            self._sleep_cancellable(rest)
-
-    def _sleep_cancellable(self, secs: float):
-        end = time.time() + secs
-        while time.time() < end and not self._stop_evt.is_set():
-            time.sleep(0.05)
+            # Event.wait bloquea sin sondeo y despierta en cuanto se llama stop()
+            if self._stop_evt.wait(rest):
+                break
 
     # ---- Lógica por tick ----
     def _tick(self):
@@ -284,10 +283,18 @@ class BirthEngine:
 
     # ---- Elegibilidad (parejas existentes) ----
     def _eligible_couples(self, year_now: int) -> List[Tuple[str, str, float]]:
+        # Recorrido directo, sin copiar items(): solo lee. Si otro motor inserta a mitad
+        # (el dict cambia de tamaño), se repite sobre una copia.
+        try:
+            return self._scan_couples(self.personas.items(), year_now)
+        except RuntimeError:
+            return self._scan_couples(list(self.personas.items()), year_now)
+
+    def _scan_couples(self, items, year_now: int) -> List[Tuple[str, str, float]]:
         out: List[Tuple[str, str, float]] = []
         seen = set()
 
-        for ced, p in list(self.personas.items()):
+        for ced, p in items:
             pareja_raw = str(p.get("pareja", "") or "")
             if not pareja_raw:
                 continue
@@ -401,6 +408,9 @@ class BirthEngine:
             "padre": _idname(padre_id, padre.get("nombre", "")),
             "madre": _idname(madre_id, madre.get("nombre", "")),
             "pareja": "",
+            "padre_id": padre_id,
+            "madre_id": madre_id,
+            "pareja_id": "",
             "filiacion": "Hijo" if baby_gender == "M" else "Hija",
             "edad": "0",
             "_hist": [
@@ -430,6 +440,7 @@ class BirthEngine:
                 try:
                     self.on_event("hijo", {
                         "cedula": pid,
+                        "nombre": self.personas.get(pid, {}).get("nombre", "¿?"),
                         "detalle": f"Nuevo hijo: {baby_name}"
                     })
                 except Exception:
@@ -76,25 +76,35 @@ class EventPanel(tk.Toplevel):
         Inserta una fila representando 'tipo' con info derivada de 'payload' y 'personas'.
         anio: año de simulación en el momento del evento.
         """
-        tipo = (tipo or "default").strip().lower()
-        if tipo == "cumpleaños" and not self.show_birthdays.get():
-            # Suprimimos cumpleaños si no quieren verlo
-            return
+        self.log_events([(anio, tipo, payload)], personas)
+
+    def log_events(self, eventos, personas: dict):
+        """
+        Inserta varias filas de una vez; eventos: lista de (anio, tipo, payload).
+        El auto scroll se hace una sola vez al final del lote.
+        """
+        last = None
+        show_birthdays = self.show_birthdays.get()
+        for anio, tipo, payload in eventos:
+            tipo = (tipo or "default").strip().lower()
+            if tipo == "cumpleaños" and not show_birthdays:
+                # Suprimimos cumpleaños si no quieren verlo
+                continue
 
-        # Derivar persona(s) y detalle
-        personas_txt, detalle = self._format_row(tipo, payload, personas)
+            # Derivar persona(s) y detalle
+            personas_txt, detalle = self._format_row(tipo, payload, personas)
 
-        # Insertar
-        values = (anio, tipo, personas_txt, detalle)
-        self._rows.append(values)
+            # Insertar
+            values = (anio, tipo, personas_txt, detalle)
+            self._rows.append(values)
 
-        tag = tipo if tipo in TIPO_COLORES else "default"
-        self._ensure_tag(tag)
+            tag = tipo if tipo in TIPO_COLORES else "default"
+            self._ensure_tag(tag)
 
-        self.tree.insert("", "end", values=values, tags=(tag,))
+            last = self.tree.insert("", "end", values=values, tags=(tag,))
 
-        if self.auto_scroll.get():
-            self.tree.see(self.tree.get_children()[-1])  # scroll al final
+        if last is not None and self.auto_scroll.get():
+            self.tree.see(last)  # scroll al final
 
     # ---------- Aux ----------
     def _ensure_tag(self, tag):
@@ -149,8 +159,10 @@ class EventPanel(tk.Toplevel):
             # detalle ya viene
 
         elif tipo == "union":
-            a_nom = payload.get("a_nombre", "")
-            b_nom = payload.get("b_nombre", "")
+            # Un solo evento por pareja: nombres directos o, si faltan, desde 'cedulas'
+            ceds = payload.get("cedulas") or []
+            a_nom = payload.get("a_nombre") or (self._pname(ceds[0], personas) if ceds else "")
+            b_nom = payload.get("b_nombre") or (self._pname(ceds[1], personas) if len(ceds) > 1 else "")
             personas_txt = f"{a_nom} + {b_nom}".strip(" +")
             sc = payload.get("score")
             detalle = f"Se unieron (compat {sc:.0%})" if isinstance(sc, (int, float)) else "Se unieron"
@@ -2,9 +2,12 @@
 import os
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from PIL import Image, ImageTk, ImageDraw
+from PIL import Image, ImageTk, ImageDraw, ImageFont
 from kinship import Kinship
-import queue
+import collections
+import concurrent.futures
+import threading
+import time
 from birthday import BirthdayEngine 
 from fallecimientos import DeathEngine
 from nacimientos import BirthEngine
@@ -38,6 +41,12 @@ MARGIN_X, MARGIN_Y = 70, 70
 COUPLE_GAP = 16
 LEVEL_LINE_COLOR = "#e7dcc7"
 LEVEL_LINE_WIDTH = 1
+TOAST_W, TOAST_H = 360, 60
+MAX_TOASTS = 3
+HIT_CELL = 128  # tamaño de celda de la rejilla de tooltips
+TILE = 512            # lado de cada tesela del árbol (px en pantalla)
+TILE_CACHE_MAX = 64   # teselas renderizadas que se conservan (LRU)
+TILE_FILTER_MARGIN = 6  # px de contenido extra por lado al escalar (soporte de LANCZOS a zoom 0.5)
 
 # Colores
 COL_CANVAS = "#fffaf0"
@@ -48,17 +57,56 @@ COL_LINE_PARENT = "#0066ff"   # Azul para padres-hijos
 COL_LINE_SPOUSE = "#ff0000"   # Rojo para parejas
 COL_LINE_SIBLING = "#ffd700"  # Amarillo para hermanos
 
-# ---- Utilidad: rectángulo redondeado en Canvas ----
-def create_round_rect(canvas, x0, y0, x1, y1, r=14, **kwargs):
-    r = max(0, min(r, (x1 - x0) // 2, (y1 - y0) // 2))
-    items = []
-    items.append(canvas.create_arc(x0, y0, x0+2*r, y0+2*r, start=90, extent=90, style="pieslice", **kwargs))
-    items.append(canvas.create_arc(x1-2*r, y0, x1, y0+2*r, start=0, extent=90, style="pieslice", **kwargs))
-    items.append(canvas.create_arc(x0, y1-2*r, x0+2*r, y1, start=180, extent=90, style="pieslice", **kwargs))
-    items.append(canvas.create_arc(x1-2*r, y1-2*r, x1, y1, start=270, extent=90, style="pieslice", **kwargs))
-    items.append(canvas.create_rectangle(x0+r, y0, x1-r, y1, **kwargs))
-    items.append(canvas.create_rectangle(x0, y0+r, x1, y1-r, **kwargs))
-    return items
+# ---- Utilidad: celdas de TILE px (contenido sin zoom) que toca un rectángulo ----
+def _tile_cells(x0, y0, x1, y1):
+    for gx in range(int(x0) // TILE, int(x1) // TILE + 1):
+        for gy in range(int(y0) // TILE, int(y1) // TILE + 1):
+            yield (gx, gy)
+
+def _node_cells(center):
+    x, y = center  # tarjeta + sombra
+    return _tile_cells(x - NODE_W//2, y - NODE_H//2, x + NODE_W//2 + 3, y + NODE_H//2 + 4)
+
+def _link_cells(pts):
+    # Margen holgado: el bus de hijos queda V_GAP//2 por encima de las tarjetas
+    xs = [p[0] for p in pts]
+    ys = [p[1] for p in pts]
+    return _tile_cells(min(xs) - NODE_W, min(ys) - NODE_H - V_GAP//2, max(xs) + NODE_W, max(ys) + NODE_H)
+
+# ---- Utilidad: imagen de fondo original (None si no hay) ----
+def _load_bg_source():
+    if not BG_PATH or not os.path.exists(BG_PATH):
+        return None
+    try:
+        return Image.open(BG_PATH).convert("RGB")
+    except Exception:
+        return None
+
+# ---- Utilidad: avatar AVATARxAVATAR desde archivo (None si no se puede abrir) ----
+def _open_avatar(path):
+    try:
+        return Image.open(path).convert("RGBA").resize((AVATAR, AVATAR), Image.Resampling.BILINEAR)
+    except Exception:
+        return None
+
+# ---- Utilidad: avatar por defecto (círculo) cuando falta el archivo ----
+def _make_avatar_placeholder():
+    im = Image.new("RGBA", (AVATAR, AVATAR), (0, 0, 0, 0))
+    d = ImageDraw.Draw(im)
+    r = AVATAR//2 - 2
+    cx = cy = AVATAR//2
+    d.ellipse((cx-r, cy-r, cx+r, cy+r), fill=(255, 243, 216, 255), outline=(141, 110, 99, 255), width=2)
+    return im
+
+# ---- Utilidad: fuente para el texto de los nodos ----
+def _load_tree_font():
+    # Equivalente a ("Georgia", 10, "bold") del canvas; si no está, la de PIL
+    for name in ("georgiab.ttf", "Georgia Bold.ttf", "georgia.ttf", "DejaVuSans-Bold.ttf"):
+        try:
+            return ImageFont.truetype(name, 13)
+        except Exception:
+            pass
+    return ImageFont.load_default()
 
 class Tooltip:
     def __init__(self, widget):
@@ -78,12 +126,19 @@ class Tooltip:
         label.pack()
         self.tip.geometry(f"+{x+16}+{y+16}")
 
+    def move(self, x, y):
+        if self.tip is not None:
+            self.tip.geometry(f"+{x+16}+{y+16}")
+
     def hide(self):
         if self.tip is not None:
             self.tip.destroy()
             self.tip = None
 
 class FamTreeApp(tk.Toplevel):
+    # Motores de simulación (atributos), en orden de arranque
+    _engine_names = ("birthday", "births", "deaths", "unions", "emotions")
+
     def __init__(self, parent):
         super().__init__(parent)
         self.title("Family Tree - Visualizador")
@@ -109,7 +164,7 @@ class FamTreeApp(tk.Toplevel):
         self.canvas = tk.Canvas(self.canvas_frame, bg=COL_CANVAS, highlightthickness=0)
         self.hbar = tk.Scrollbar(self.canvas_frame, orient="horizontal", command=self.canvas.xview)
         self.vbar = tk.Scrollbar(self.canvas_frame, orient="vertical", command=self.canvas.yview)
-        self.canvas.configure(xscrollcommand=self.hbar.set, yscrollcommand=self.vbar.set)
+        self.canvas.configure(xscrollcommand=self._on_xscroll, yscrollcommand=self._on_yscroll)
 
         self.canvas.grid(row=0, column=0, sticky="nsew")
         self.vbar.grid(row=0, column=1, sticky="ns")
@@ -121,17 +176,49 @@ class FamTreeApp(tk.Toplevel):
         # Datos
         self.familias = self._load_familias()
         self.personas = self._load_personas()
-        self.avatar_cache = {}
-        self.bg_cache = None  # (w,h) -> tkimage
+        self._pil_avatar_cache = {}  # ruta absoluta -> PIL RGBA AVATARxAVATAR
+        self._avatar_placeholder = _make_avatar_placeholder()
+        self._preload_avatars()
+        self.bg_cache = collections.OrderedDict()  # (w, h, rapido) -> tkimage, últimos 4
+        self._bg_source_pil = _load_bg_source()  # fondo decodificado una sola vez
+        self._bg_thumb = None
+        if self._bg_source_pil is not None:
+            self._bg_thumb = self._bg_source_pil.copy()
+            self._bg_thumb.thumbnail((480, 480))  # base barata mientras se arrastra
+        self._resize_after = None
+        self._configure_after = None
+        self._last_configure_size = None
         self.spouse_of = self._build_spouse_index()
         self.kin = Kinship(self.personas)
-
-        self.node_hitmap = {}  # canvas_id -> cedula (para tooltips)
+        self._kin_precomputed = {}  # cedula -> KinRecord de la familia dibujada
+
+        # Rejilla espacial para tooltips: (col, fila) -> [(x0, y0, x1, y1, cedula)]
+        self._grid = {}
+        # Transformación actual del contenido: canvas = s*contenido + (ox, oy)
+        self._view_tf = (1.0, 0.0, 0.0)
+        self._last_motion_xy = None
+        self._last_hover_ced = None
+        self._motion_after = None
+        self._tooltip_cache = {}  # cedula -> texto ya formateado (se vacía en _redraw)
+
+        # Árbol renderizado por teselas bajo demanda (caché LRU)
+        self._positions = {}
+        self._links = []
+        self._level_ys = []
+        self._tile_links = {}   # (col, fila) de contenido -> índices de enlaces
+        self._tile_nodes = {}   # (col, fila) de contenido -> cédulas
+        self._tiles = collections.OrderedDict()  # (tx, ty, zoom) -> PhotoImage
+        self._tile_items = {}   # (tx, ty) -> id del ítem en el canvas
+        self._tiles_zoom = None
+        self._tiles_after = None
+        self._drawn_frame = None  # (familia, ancho, alto, niveles) del último dibujo
+        self._drawn_nodes = {}    # cedula -> firma visual del último dibujo
+        self._tree_font = _load_tree_font()
 
         # Para fondo responsive
         self._content_w = 0
         self._content_h = 0
-        self._bg_drawn_size = (0, 0)
+        self._bg_drawn_size = (0, 0, False)
 
         # UI
         tk.Label(self.topbar, text="Familia:", bg="#f5f5dc").pack(side="left")
@@ -147,6 +234,12 @@ class FamTreeApp(tk.Toplevel):
         tk.Button(self.topbar, text="Centrar", command=self._center_view).pack(side="left", padx=6)
         tk.Button(self.topbar, text="Exportar PNG", command=self._export_png).pack(side="left", padx=6)
 
+        # Posición de toasts (se recalcula solo al mover/redimensionar)
+        self._toast_xy = (0, 0)
+        self._toast_geom_key = None
+        self._live_toasts = collections.deque()
+        self.bind("<Configure>", self._on_main_configure)
+
         # Eventos
         self.canvas.bind("<Configure>", self._on_canvas_configure)
         self.canvas.bind("<Control-MouseWheel>", self._on_zoom)          # Windows
@@ -155,7 +248,7 @@ class FamTreeApp(tk.Toplevel):
 
         # Tooltips
         self.canvas.bind("<Motion>", self._on_motion)
-        self.canvas.bind("<Leave>", lambda e: self.tooltip.hide())
+        self.canvas.bind("<Leave>", self._on_leave)
 
         if self.familias:
             self.sel_familia.set(f"{self.familias[0][0]} - {self.familias[0][1]}")
@@ -163,11 +256,15 @@ class FamTreeApp(tk.Toplevel):
             
         # ---- Controles de simulación ----
         self.var_show_cumples = tk.BooleanVar(value=False)
+        self._rebuild_subscriptions()
+        self.var_show_cumples.trace_add("write", self._rebuild_subscriptions)
+        ttk.Checkbutton(self.topbar, text="Toasts cumpleaños", variable=self.var_show_cumples).pack(side="left", padx=6)
 
         self.btn_start = tk.Button(self.topbar, text="Iniciar sim", command=self._start_sim)
         self.btn_stop  = tk.Button(self.topbar, text="Detener", command=self._stop_sim, state="disabled")
         tk.Button(self.topbar, text="Panel eventos", command=self._open_event_panel).pack(side="left", padx=6)
         self._event_panel = None
+        self._event_panel_open = threading.Event()
 
         self.lbl_timer = tk.Label(self.topbar, text="Año sim: —  | Próximo tick: —s", bg="#f5f5dc")
 
@@ -176,8 +273,11 @@ class FamTreeApp(tk.Toplevel):
         self.lbl_timer.pack(side="left", padx=16)
 
         # ---- Motores + cola de eventos (NO los inicies aquí) ----
-        self._evt_queue = queue.Queue()
-        self._sim_running = False
+        # deque: append/popleft son atómicos con el GIL, sin tocar Tcl desde los hilos
+        self._evt_dq = collections.deque(maxlen=10000)
+        self._sim_running = threading.Event()
+        self._redraw_pending = threading.Event()  # lo marcan los motores; redibuja _drain_events
+        self._drain_after = self.after(30, self._drain_events)
 
         # Conecta BirthdayEngine (1 año por 10s)
         self.birthday = BirthdayEngine(
@@ -235,21 +335,42 @@ class FamTreeApp(tk.Toplevel):
             mortality_threshold=5
         )
 
+        # Lista fija de motores para start/stop
+        self._engines = tuple(getattr(self, n) for n in self._engine_names if hasattr(self, n))
+
         self._countdown = self.birthday.segundos_por_tick
-        self._update_timer_ui()   # pinta el estado inicial
+        self._last_timer_txt = None
+        self._update_timer_ui(force=True)   # pinta el estado inicial
     
     def _open_event_panel(self):
     # Crea o muestra el panel
-        if self._event_panel is None or not self._event_panel.winfo_exists():
+        if not self._event_panel_open.is_set():
             self._event_panel = EventPanel(self, show_birthdays=False, auto_scroll=True)
+            self._event_panel_open.set()
+            self._event_panel.bind("<Destroy>", self._on_event_panel_destroy)
         else:
             self._event_panel.deiconify()
             self._event_panel.lift()
 
+    def _on_event_panel_destroy(self, event):
+        # <Destroy> también llega por cada hijo del Toplevel
+        if event.widget is self._event_panel:
+            self._event_panel_open.clear()
+
     # --- cierre limpio de la ventana ---
     def destroy(self):
         try:
-            if getattr(self, "_sim_running", False):
+            if getattr(self, "_drain_after", None):
+                self.after_cancel(self._drain_after)
+            if getattr(self, "_motion_after", None):
+                self.after_cancel(self._motion_after)
+            if getattr(self, "_configure_after", None):
+                self.after_cancel(self._configure_after)
+            if getattr(self, "_resize_after", None):
+                self.after_cancel(self._resize_after)
+            if getattr(self, "_tiles_after", None):
+                self.after_cancel(self._tiles_after)
+            if hasattr(self, "_sim_running") and self._sim_running.is_set():
                 self._stop_sim()  # detiene birthday/births/deaths si los tienes conectados ahí
         finally:
             super().destroy()
@@ -259,44 +380,57 @@ class FamTreeApp(tk.Toplevel):
         out = []
         if os.path.exists(FAMILIAS_FILE):
             with open(FAMILIAS_FILE, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    partes = line.split(";")
-                    if len(partes) >= 2:
-                        out.append((partes[0].strip(), partes[1].strip()))
+                data = f.read()
+            for line in data.split("\n"):
+                line = line.strip()
+                if not line:
+                    continue
+                partes = line.split(";")
+                if len(partes) >= 2:
+                    out.append((partes[0].strip(), partes[1].strip()))
         return out
 
     def _load_personas(self):
         p = {}
         if os.path.exists(PERSONAS_FILE):
             with open(PERSONAS_FILE, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    d = line.split(";")
-                    if len(d) < 13:
-                        continue
-                    fam_id = d[0].split(" - ")[0].strip()
-                    p[d[1].strip()] = {
-                        "familia": fam_id,
-                        "cedula": d[1].strip(),
-                        "nombre": d[2].strip(),
-                        "nac": d[3].strip(),
-                        "falle": d[4].strip(),
-                        "genero": d[5].strip(),
-                        "provincia": d[6].strip(),
-                        "estado": d[7].strip(),
-                        "avatar": d[8].strip(),
-                        "padre": d[9].strip(),
-                        "madre": d[10].strip(),
-                        "pareja": d[11].strip(),
-                        "filiacion": d[12].strip()
-                    }
+                data = f.read()
+            for line in data.split("\n"):
+                line = line.strip()
+                if not line:
+                    continue
+                d = line.split(";")
+                if len(d) < 13:
+                    continue
+                ced = d[1].strip()
+                p[ced] = {
+                    "familia": d[0].split(" - ", 1)[0].strip(),
+                    "cedula": ced,
+                    "nombre": d[2].strip(),
+                    "nac": d[3].strip(),
+                    "falle": d[4].strip(),
+                    "genero": d[5].strip(),
+                    "provincia": d[6].strip(),
+                    "estado": d[7].strip(),
+                    "avatar": d[8].strip(),
+                    "padre": d[9].strip(),
+                    "madre": d[10].strip(),
+                    "pareja": d[11].strip(),
+                    # ids ya normalizados ("123 - Nombre" -> "123") para los recorridos
+                    "padre_id": d[9].split(" - ", 1)[0].strip(),
+                    "madre_id": d[10].split(" - ", 1)[0].strip(),
+                    "pareja_id": d[11].split(" - ", 1)[0].strip(),
+                    "filiacion": d[12].strip()
+                }
         return p
 
+    def _preload_avatars(self):
+        # Decodificar/redimensionar en paralelo (PIL suelta el GIL) antes del primer dibujo
+        paths = {os.path.join(AVATAR_DIR, p["avatar"]) for p in self.personas.values() if p.get("avatar")}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as ex:
+            for path, im in zip(paths, ex.map(_open_avatar, paths)):
+                self._pil_avatar_cache[path] = im or self._avatar_placeholder
+
     def _id_from_combo(self, text):
         if not text:
             return ""
@@ -306,66 +440,89 @@ class FamTreeApp(tk.Toplevel):
         spouse = {}
         for c in self.personas.values():
             if c.get("estado") in ("Casado/a", "Unión libre"):
-                m = self._id_from_combo(c.get("pareja", ""))
+                m = c.get("pareja_id", "")
                 if m and m in self.personas:
                     spouse[c["cedula"]] = m
         return spouse
 
     # --------- Cálculo de layout ----------
     def _compute_generations(self, cedulas_fam):
-        # 1) Inicializa niveles por ascendencia (padres -> hijo = +1)
-        level = {c: 0 for c in cedulas_fam}
-        changed = True
-        loops = 0
-        while changed and loops < 60:
+        # Todo el cálculo sobre índices enteros 0..n-1 (listas paralelas, sin dicts por persona)
+        n = len(cedulas_fam)
+        idx = {c: i for i, c in enumerate(cedulas_fam)}
+        level = [0] * n
+
+        # 1) Grafo padres -> hijos dentro de la familia (ids parseados una sola vez)
+        children = [[] for _ in range(n)]
+        indeg = [0] * n
+        personas = self.personas
+        for i, ced in enumerate(cedulas_fam):
+            p = personas[ced]
+            for par in {p.get("padre_id", ""), p.get("madre_id", "")}:
+                j = idx.get(par)
+                if j is not None and j != i:
+                    children[j].append(i)
+                    indeg[i] += 1
+
+        # Orden topológico (Kahn); si hubiera ciclos en los datos, esos nodos quedan fuera
+        order = []
+        pending = collections.deque(i for i in range(n) if indeg[i] == 0)
+        while pending:
+            i = pending.popleft()
+            order.append(i)
+            for h in children[i]:
+                indeg[h] -= 1
+                if indeg[h] == 0:
+                    pending.append(h)
+
+        def relax():
+            # Camino más largo: hijo al menos un nivel debajo de cada padre
             changed = False
-            loops += 1
-            for ced in cedulas_fam:
-                p = self.personas[ced]
-                parents = []
-                for par in (self._id_from_combo(p.get("padre")), self._id_from_combo(p.get("madre"))):
-                    if par in level:
-                        parents.append(level[par])
-                if parents:
-                    new = max(parents) + 1
-                    if new != level[ced]:
-                        level[ced] = new
+            for i in order:
+                nxt = level[i] + 1
+                for h in children[i]:
+                    if level[h] < nxt:
+                        level[h] = nxt
                         changed = True
+            return changed
 
-        # 2) Igualar cónyuges al mismo nivel (al MÁXIMO entre ambos)
-        spouse_changed = True
-        loops = 0
-        while spouse_changed and loops < 60:
-            spouse_changed = False
-            loops += 1
-            for a, pa in self.personas.items():
-                b = self.spouse_of.get(a)
-                if not b or b not in level:
-                    continue
-                la, lb = level[a], level[b]
-                target = max(la, lb)
-                if la != target:
-                    level[a] = target
-                    spouse_changed = True
-                if lb != target:
-                    level[b] = target
-                    spouse_changed = True
-
-            # Re-afirmar la restricción de padres->hijo (+1) si algo se movió
-            if spouse_changed:
-                for ced in cedulas_fam:
-                    p = self.personas[ced]
-                    parents = []
-                    for par in (self._id_from_combo(p.get("padre")), self._id_from_combo(p.get("madre"))):
-                        if par in level:
-                            parents.append(level[par])
-                    if parents:
-                        min_child = max(parents) + 1
-                        if level[ced] < min_child:
-                            level[ced] = min_child
-                            spouse_changed = True
-
-        return level
+        relax()
+
+        # 2) Cónyuges al mismo nivel (al MÁXIMO del grupo) vía union-find
+        uf = list(range(n))
+
+        def find(x):
+            while uf[x] != x:
+                uf[x] = uf[uf[x]]
+                x = uf[x]
+            return x
+
+        for a, b in self.spouse_of.items():
+            i, j = idx.get(a), idx.get(b)
+            if i is not None and j is not None:
+                uf[find(i)] = find(j)
+
+        groups = collections.defaultdict(list)
+        for i in range(n):
+            groups[find(i)].append(i)
+        groups = [g for g in groups.values() if len(g) > 1]
+
+        def equalize():
+            changed = False
+            for members in groups:
+                target = max(level[m] for m in members)
+                for m in members:
+                    if level[m] != target:
+                        level[m] = target
+                        changed = True
+            return changed
+
+        # Re-afirmar padres->hijo (+1) si algo se movió
+        for _ in range(60):
+            if not equalize() or not relax():
+                break
+
+        return dict(zip(cedulas_fam, level))
 
     def _group_couples_in_level(self, row):
         seen = set()
@@ -399,39 +556,27 @@ class FamTreeApp(tk.Toplevel):
 
         level_blocks = {lvl: self._group_couples_in_level(by_level[lvl]) for lvl in by_level}
 
-        def block_width(block):
-            if len(block) == 1:
-                return NODE_W
-            return NODE_W*len(block) + COUPLE_GAP*(len(block)-1)
-
         max_blocks = max((len(level_blocks[lvl]) for lvl in level_blocks), default=1)
         content_w = max_blocks * (max(NODE_W, 120) + H_GAP) + MARGIN_X*2
         content_h = (max_level + 1) * (NODE_H + V_GAP) + MARGIN_Y*2
 
+        # Forma cerrada: cada miembro i de un bloque queda en x_bloque + i*paso,
+        # y un bloque de k miembros ocupa k*paso - COUPLE_GAP
+        step = NODE_W + COUPLE_GAP
         positions = {}
         for lvl in range(max_level + 1):
-            blocks = level_blocks.get(lvl, [])
-            x = MARGIN_X
             y = MARGIN_Y + lvl*(NODE_H + V_GAP) + NODE_H//2
-            for block in blocks:
-                w = block_width(block)
-                cx = x + w//2
-                if len(block) == 1:
-                    positions[block[0]] = (cx, y)
-                else:
-                    total = NODE_W*len(block) + COUPLE_GAP*(len(block)-1)
-                    left_start = cx - total//2 + NODE_W//2
-                    for i, ced in enumerate(block):
-                        xi = left_start + i*(NODE_W + COUPLE_GAP)
-                        positions[ced] = (xi, y)
-                x += w + H_GAP
+            x = MARGIN_X + NODE_W//2
+            for block in level_blocks.get(lvl, ()):
+                for i, ced in enumerate(block):
+                    positions[ced] = (x + i*step, y)
+                x += len(block)*step - COUPLE_GAP + H_GAP
         return positions, content_w, content_h, max_level
 
     # --------- Dibujo ----------
     def _redraw(self, *_):
         self.tooltip.hide()
-        self.canvas.delete("content")  # borra solo el contenido, no el fondo
-        self.node_hitmap.clear()
+        self._tooltip_cache.clear()
 
         # 🔁 Recalcular índice de parejas (no usado por cumpleaños, pero útil si ya hay datos)
         self.spouse_of = self._build_spouse_index()
@@ -449,41 +594,81 @@ class FamTreeApp(tk.Toplevel):
         cedulas_fam = sorted(set(cedulas_fam), key=lambda c: self.personas[c]["nombre"].lower())
 
         if not cedulas_fam:
+            self.canvas.delete("content")  # borra solo el contenido, no el fondo
+            self._grid.clear()
+            self._tiles.clear()
+            self._tile_items.clear()
+            self._positions, self._links = {}, []
+            self._drawn_frame, self._drawn_nodes = None, {}
             messagebox.showinfo("Sin datos", "Esta familia aún no tiene integrantes registrados.")
             return
 
+        # Parentescos de toda la familia de una vez (los tooltips solo formatean)
+        self.kin = Kinship(self.personas)
+        self._kin_precomputed = self.kin.precompute_all(cedulas_fam)
+
         levels = self._compute_generations(cedulas_fam)
         positions, content_w, content_h, max_level = self._compute_positions(levels, cedulas_fam)
 
         # Aire extra
         content_w = int(content_w * 1.2)
         content_h = int(content_h * 1.2)
+        # La imagen recorta lo que quede fuera: cubrir siempre la tarjeta más a la derecha
+        content_w = max(content_w, max(x for x, _ in positions.values()) + NODE_W//2 + MARGIN_X)
+
+        # Líneas de nivel (decorativas)
+        level_ys = [
+            MARGIN_Y + lvl*(NODE_H + V_GAP) + NODE_H//2 + AVATAR//2 + 6
+            for lvl in range(max_level + 1)
+        ]
+        links = self._collect_links(cedulas_fam, positions)
+        nodes = {ced: self._node_signature(ced, center) for ced, center in positions.items()}
+
+        # Misma familia y mismo marco: solo se repintan las teselas que cambian
+        frame = (familia_id, content_w, content_h, tuple(level_ys))
+        dirty = self._dirty_cells(nodes, links) if frame == self._drawn_frame else None
+        self._drawn_frame, self._drawn_nodes = frame, nodes
 
         # Fondo/scroll
         self._content_w, self._content_h = content_w, content_h
         self._fit_background()
 
-        # Líneas de nivel (decorativas)
-        for lvl in range(max_level + 1):
-            y = MARGIN_Y + lvl*(NODE_H + V_GAP) + NODE_H//2
-            self.canvas.create_line(
-                MARGIN_X//3, y + AVATAR//2 + 6,
-                content_w - MARGIN_X//3, y + AVATAR//2 + 6,
-                fill=LEVEL_LINE_COLOR, width=LEVEL_LINE_WIDTH, tags=("content",)
-            )
+        self._level_ys = level_ys
+        self._positions = positions
+        self._links = links
+
+        # Área para tooltips (rejilla en coordenadas sin zoom)
+        self._grid.clear()
+        for ced, center in positions.items():
+            self._register_hit(ced, center)
+
+        # Las teselas se pintan al mostrarse; aquí solo se indexa el contenido
+        self._build_tile_index()
+        if dirty is not None:
+            if dirty:
+                self._invalidate_cells(dirty)
+                self._show_tiles()
+            return
 
-        # Enlaces padre/madre -> hijo (AZUL)
-        for ced in cedulas_fam:
-            p = self.personas[ced]
-            padre = self._id_from_combo(p.get("padre"))
-            madre = self._id_from_combo(p.get("madre"))
-            child_pos = positions.get(ced)
-            for par in (padre, madre):
-                if par and par in positions and child_pos:
-                    self._draw_parent_link(positions[par], child_pos)
+        self._tiles.clear()
+        self._show_tiles(reset=True)
+        self.canvas.xview_moveto(0)
+        self.canvas.yview_moveto(0)
+        self._center_view()
+
+    def _collect_links(self, cedulas_fam, positions):
+        """Lista de enlaces (extremos, dibujar, args) en el orden en que se pintan."""
+        links = []
 
-        # Enlaces hermanos (AMARILLO)
-        self._draw_sibling_links(cedulas_fam, positions)
+        # Padres -> hijos (AZUL) con bus compartido; el tramo entre hermanos va en AMARILLO
+        for (padre, madre), hs in self._child_groups(cedulas_fam, positions):
+            kids = [positions[h] for h in hs]
+            pars = [positions[q] for q in (padre, madre) if q in positions]
+            if pars:
+                top = (sum(x for x, _ in pars) // len(pars), max(y for _, y in pars))
+                links.append(((padre, madre, *hs), self._draw_family_bus, (top, *kids)))
+            elif len(hs) > 1:
+                links.append((tuple(hs), self._draw_sibling_link, (kids[0], kids[-1])))
 
         # Enlaces conyugales (ROJO)
         drawn = set()
@@ -492,50 +677,215 @@ class FamTreeApp(tk.Toplevel):
             if mate and mate in positions:
                 a, b = sorted([ced, mate])
                 if (a, b) not in drawn:
-                    self._draw_spouse_link(positions[a], positions[b])
+                    links.append(((a, b), self._draw_spouse_link, (positions[a], positions[b])))
                     drawn.add((a, b))
+        return links
 
-        # Nodos
-        for ced in cedulas_fam:
-            self._draw_person_node(ced, positions[ced])
+    def _register_hit(self, cedula, center):
+        x, y = center
+        entry = (x - NODE_W//2, y - NODE_H//2, x + NODE_W//2, y + NODE_H//2, cedula)
+        for gx in range(entry[0] // HIT_CELL, entry[2] // HIT_CELL + 1):
+            for gy in range(entry[1] // HIT_CELL, entry[3] // HIT_CELL + 1):
+                self._grid.setdefault((gx, gy), []).append(entry)
+
+    def _build_tile_index(self):
+        """Reparte enlaces y nodos en celdas de TILE px de contenido (sin zoom)."""
+        self._tile_links = {}
+        self._tile_nodes = {}
+        for i, (_ends, _draw, pts) in enumerate(self._links):
+            for c in _link_cells(pts):
+                self._tile_links.setdefault(c, []).append(i)
+        for ced, center in self._positions.items():
+            for c in _node_cells(center):
+                self._tile_nodes.setdefault(c, []).append(ced)
+
+    def _node_signature(self, cedula, center):
+        # Todo lo que _draw_person_node pinta de una persona
+        p = self.personas[cedula]
+        return (center, p.get("nombre", ""), p.get("falle", ""), p.get("avatar"),
+                bool(str(p.get("adoptado", "")).strip()))
+
+    def _dirty_cells(self, nodes, links):
+        """Celdas de contenido donde el dibujo nuevo difiere del anterior."""
+        cells = set()
+        old = self._drawn_nodes
+        for ced in old.keys() | nodes.keys():
+            a, b = old.get(ced), nodes.get(ced)
+            if a != b:
+                for sig in (a, b):
+                    if sig:
+                        cells.update(_node_cells(sig[0]))
+        old_links = {(draw.__name__, pts) for _e, draw, pts in self._links}
+        new_links = {(draw.__name__, pts) for _e, draw, pts in links}
+        for _name, pts in old_links ^ new_links:
+            cells.update(_link_cells(pts))
+        return cells
+
+    def _invalidate_cells(self, cells):
+        """Descarta las teselas (de cualquier zoom) que tocan esas celdas."""
+        for key in list(self._tiles):
+            tx, ty, z = key
+            cx0, cy0, cw, ch = self._tile_rect(tx, ty, z)
+            if any(c in cells for c in _tile_cells(cx0, cy0, cx0 + cw, cy0 + ch)):
+                del self._tiles[key]
+                if z == self._tiles_zoom:
+                    item = self._tile_items.pop((tx, ty), None)
+                    if item is not None:
+                        self.canvas.delete(item)
+
+    def _render_region(self, x0, y0, w, h):
+        """Pinta el rectángulo de contenido (x0, y0, w, h) en una imagen RGBA."""
+        img = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+        d = ImageDraw.Draw(img, "RGBA")
+
+        for y in self._level_ys:
+            d.line(
+                [(MARGIN_X//3 - x0, y - y0), (self._content_w - MARGIN_X//3 - x0, y - y0)],
+                fill=LEVEL_LINE_COLOR, width=LEVEL_LINE_WIDTH
+            )
 
-        # Scrollregion
-        view_w = max(self._content_w, self.canvas.winfo_width())
-        view_h = max(self._content_h, self.canvas.winfo_height())
-        self.canvas.config(scrollregion=(0, 0, view_w, view_h))
-        self._center_view()
+        cells = [
+            (gx, gy)
+            for gx in range(x0 // TILE, (x0 + w) // TILE + 1)
+            for gy in range(y0 // TILE, (y0 + h) // TILE + 1)
+        ]
+        links = sorted({i for c in cells for i in self._tile_links.get(c, ())})
+        nodes = dict.fromkeys(ced for c in cells for ced in self._tile_nodes.get(c, ()))
+
+        for i in links:
+            _ends, draw, pts = self._links[i]
+            draw(d, *[(px - x0, py - y0) for px, py in pts])
+        for ced in nodes:
+            x, y = self._positions[ced]
+            self._draw_person_node(img, d, ced, (x - x0, y - y0))
+        return img
+
+    def _render_tree_to_image(self):
+        """Árbol completo en una imagen RGBA del tamaño del contenido."""
+        return self._render_region(0, 0, self._content_w, self._content_h)
+
+    def _tile_zoom(self):
+        # Zoom redondeado a pasos de 0.25: las teselas se reutilizan entre pasos
+        return max(0.5, round(self.zoom_scale * 4) / 4)
+
+    def _tile_rect(self, tx, ty, z):
+        # Rectángulo de contenido (x0, y0, w, h) que cubre la tesela a este zoom
+        cx0 = int(tx * TILE / z)
+        cy0 = int(ty * TILE / z)
+        cw = max(1, int((tx + 1) * TILE / z) - cx0)
+        ch = max(1, int((ty + 1) * TILE / z) - cy0)
+        return cx0, cy0, cw, ch
+
+    def _ensure_tile(self, tx, ty, z):
+        key = (tx, ty, z)
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            return tile
+
+        cx0, cy0, cw, ch = self._tile_rect(tx, ty, z)
+        if (cw, ch) == (TILE, TILE):
+            im = self._render_region(cx0, cy0, cw, ch)
+        else:
+            # Filtrado como el fondo: LANCZOS al alejar conserva líneas finas y bordes,
+            # BICUBIC al acercar evita el texto pixelado. Se pinta un margen para que el
+            # filtro vea los píxeles vecinos y no se noten las uniones entre teselas.
+            m = TILE_FILTER_MARGIN
+            im = self._render_region(cx0 - m, cy0 - m, cw + 2 * m, ch + 2 * m)
+            resample = Image.Resampling.LANCZOS if z < 1 else Image.Resampling.BICUBIC
+            im = im.resize((TILE, TILE), resample, box=(m, m, m + cw, m + ch))
+        tile = ImageTk.PhotoImage(im)
+        self._tiles[key] = tile
+
+        while len(self._tiles) > TILE_CACHE_MAX:
+            (ox, oy, oz), _old = self._tiles.popitem(last=False)
+            if oz == self._tiles_zoom:
+                item = self._tile_items.pop((ox, oy), None)
+                if item is not None:
+                    self.canvas.delete(item)
+        return tile
+
+    def _show_tiles(self, reset=False):
+        """Crea en el canvas las teselas visibles que falten."""
+        self._tiles_after = None
+        z = self._tile_zoom()
+        if reset or z != self._tiles_zoom:
+            self.canvas.delete("content")
+            self._tile_items.clear()
+            self._tiles_zoom = z
+            self._view_tf = (z, 0.0, 0.0)
+
+            # Scrollregion
+            view_w = max(int(self._content_w * z), self.canvas.winfo_width())
+            view_h = max(int(self._content_h * z), self.canvas.winfo_height())
+            self.canvas.config(scrollregion=(0, 0, view_w, view_h))
+        if not self._positions:
+            return
+
+        # Teselas visibles (+1 de margen), limitadas al contenido
+        n_tx = -(-int(self._content_w * z) // TILE)
+        n_ty = -(-int(self._content_h * z) // TILE)
+        vx0 = int(self.canvas.canvasx(0)) // TILE - 1
+        vy0 = int(self.canvas.canvasy(0)) // TILE - 1
+        vx1 = int(self.canvas.canvasx(self.canvas.winfo_width())) // TILE + 1
+        vy1 = int(self.canvas.canvasy(self.canvas.winfo_height())) // TILE + 1
+
+        for tx in range(max(0, vx0), min(n_tx - 1, vx1) + 1):
+            for ty in range(max(0, vy0), min(n_ty - 1, vy1) + 1):
+                if (tx, ty) in self._tile_items:
+                    self._tiles.move_to_end((tx, ty, z))
+                    continue
+                tile = self._ensure_tile(tx, ty, z)
+                self._tile_items[(tx, ty)] = self.canvas.create_image(
+                    tx * TILE, ty * TILE, image=tile, anchor="nw", tags=("content",)
+                )
+
+    def _schedule_tiles(self):
+        if self._tiles_after is None:
+            self._tiles_after = self.after(30, self._show_tiles)
+
+    def _on_xscroll(self, first, last):
+        self.hbar.set(first, last)
+        self._schedule_tiles()
+
+    def _on_yscroll(self, first, last):
+        self.vbar.set(first, last)
+        self._schedule_tiles()
 
     def _center_view(self):
         self.update_idletasks()
-        bbox = self.canvas.bbox("content")
-        if not bbox:
+        if not self._positions:
             return
         self.canvas.xview_moveto(0)
         self.canvas.yview_moveto(0)
 
     # ---- Fondo pergamino (cover) ----
-    def _draw_background(self, w, h):
+    def _draw_background(self, w, h, fast=False):
         self.canvas.delete("bg")
-        if not BG_PATH or not os.path.exists(BG_PATH):
+        src = self._bg_thumb if fast else self._bg_source_pil
+        if src is None:
             self.canvas.create_rectangle(0, 0, w, h, fill=COL_CANVAS, outline="", tags=("bg",))
             self.canvas.tag_lower("bg")
             return
 
-        cache_key = (w, h)
-        if self.bg_cache and self.bg_cache[0] == cache_key:
-            tkimg = self.bg_cache[1]
+        cache_key = (w, h, fast)
+        tkimg = self.bg_cache.get(cache_key)
+        if tkimg is not None:
+            self.bg_cache.move_to_end(cache_key)
         else:
             try:
-                base = Image.open(BG_PATH).convert("RGB")
-                bw, bh = base.size
+                bw, bh = src.size
                 scale = max(w / bw, h / bh)
                 new_size = (max(1, int(bw * scale)), max(1, int(bh * scale)))
-                img = base.resize(new_size, Image.Resampling.LANCZOS)
+                resample = Image.Resampling.NEAREST if fast else Image.Resampling.LANCZOS
+                img = src.resize(new_size, resample)
                 x_left = max(0, (img.width - w) // 2)
                 y_top = max(0, (img.height - h) // 2)
                 img = img.crop((x_left, y_top, x_left + w, y_top + h))
                 tkimg = ImageTk.PhotoImage(img)
-                self.bg_cache = (cache_key, tkimg)
+                self.bg_cache[cache_key] = tkimg
+                while len(self.bg_cache) > 4:
+                    self.bg_cache.popitem(last=False)
             except Exception:
                 tkimg = None
 
@@ -547,71 +897,94 @@ class FamTreeApp(tk.Toplevel):
         self.canvas.tag_lower("bg")
 
     def _on_canvas_configure(self, event):
+        # <Configure> también llega sin cambio de tamaño
+        size = (event.width, event.height)
+        if size == self._last_configure_size:
+            return
+        self._last_configure_size = size
+        if self._configure_after is not None:
+            self.after_cancel(self._configure_after)
+        self._configure_after = self.after(80, self._do_configure)
+
+    def _do_configure(self):
+        self._configure_after = None
         if self._content_w == 0 and self._content_h == 0:
             return
-        self._fit_background()
-        view_w = max(self._content_w, self.canvas.winfo_width())
-        view_h = max(self._content_h, self.canvas.winfo_height())
+        # Primero la versión rápida; LANCZOS cuando el tamaño se asienta
+        self._fit_background(fast=True)
+        if self._resize_after is not None:
+            self.after_cancel(self._resize_after)
+        self._resize_after = self.after(120, self._fit_background_final)
+        z = self._tiles_zoom or 1.0
+        view_w = max(int(self._content_w * z), self.canvas.winfo_width())
+        view_h = max(int(self._content_h * z), self.canvas.winfo_height())
         self.canvas.config(scrollregion=(0, 0, view_w, view_h))
 
-    def _fit_background(self):
+    def _fit_background_final(self):
+        self._resize_after = None
+        self._fit_background()
+
+    def _fit_background(self, fast=False):
         need_w = max(self._content_w, self.canvas.winfo_width())
         need_h = max(self._content_h, self.canvas.winfo_height())
-        if (need_w, need_h) != self._bg_drawn_size:
-            self._draw_background(need_w, need_h)
-            self._bg_drawn_size = (need_w, need_h)
+        dw, dh, drawn_fast = self._bg_drawn_size
+        # Ya está a ese tamaño con igual o mejor calidad
+        if (need_w, need_h) == (dw, dh) and (fast or not drawn_fast):
+            return
+        self._draw_background(need_w, need_h, fast)
+        self._bg_drawn_size = (need_w, need_h, fast)
 
     # ---- Enlaces ----
-    def _draw_parent_link(self, a, b):
-        ax, ay = a
-        bx, by = b
-        mx = (ax + bx) / 2
-        o = AVATAR//2 - 6
-        self.canvas.create_line(
-            ax, ay + o,
-            mx, ay + o,
-            mx, by - o,
-            bx, by - o,
-            smooth=True, width=2, fill=COL_LINE_PARENT, tags=("content",)
+    def _draw_family_bus(self, d, top, *kids):
+        """Tronco desde los padres, bus horizontal sobre los hijos y un tramo a cada tarjeta."""
+        px, py = top
+        xs = [k[0] for k in kids]
+        x_left, x_right = min(xs), max(xs)
+        yb = min(k[1] for k in kids) - NODE_H//2 - V_GAP//2
+        d.line(
+            [(px, py), (px, yb), (min(max(px, x_left), x_right), yb)],
+            width=2, fill=COL_LINE_PARENT
         )
+        if len(kids) > 1:
+            d.line([(x_left, yb), (x_right, yb)], width=2, fill=COL_LINE_SIBLING)
+        for kx, ky in kids:
+            d.line([(kx, yb), (kx, ky - NODE_H//2)], width=2, fill=COL_LINE_PARENT)
 
-    def _draw_spouse_link(self, a, b):
+    def _draw_spouse_link(self, d, a, b):
         ax, ay = a
         bx, by = b
         y = (ay + by) // 2
-        self.canvas.create_line(
-            ax + NODE_W//2 - AVATAR//2, y,
-            bx - NODE_W//2 + AVATAR//2, y,
-            width=3, fill=COL_LINE_SPOUSE, capstyle="round", tags=("content",)
+        d.line(
+            [(ax + NODE_W//2 - AVATAR//2, y), (bx - NODE_W//2 + AVATAR//2, y)],
+            width=3, fill=COL_LINE_SPOUSE
         )
 
-    def _draw_sibling_links(self, cedulas_fam, positions):
+    def _child_groups(self, cedulas_fam, positions):
+        """[((padre, madre), hijos ordenados por x)] de los hijos con posición."""
         groups = {}
         for ced in cedulas_fam:
+            if ced not in positions:
+                continue
             p = self.personas[ced]
-            padre = self._id_from_combo(p.get("padre"))
-            madre = self._id_from_combo(p.get("madre"))
+            padre = p.get("padre_id", "")
+            madre = p.get("madre_id", "")
             if padre or madre:
-                key = (padre or "-", madre or "-")
-                groups.setdefault(key, []).append(ced)
+                groups.setdefault((padre or "-", madre or "-"), []).append(ced)
 
-        for key, hermanos in groups.items():
-            if len(hermanos) < 2:
-                continue
-            hs = [h for h in hermanos if h in positions]
-            if len(hs) < 2:
-                continue
+        out = []
+        for key, hs in groups.items():
             hs.sort(key=lambda c: positions[c][0])
-            x_left = positions[hs[0]][0]
-            x_right = positions[hs[-1]][0]
-            y = positions[hs[0]][1] + AVATAR//2 - 2
-            self.canvas.create_line(
-                x_left, y, x_right, y,
-                width=2, fill=COL_LINE_SIBLING, tags=("content",)
-            )
+            out.append((key, hs))
+        return out
+
+    def _draw_sibling_link(self, d, a, b):
+        x_left = a[0]
+        x_right = b[0]
+        y = a[1] + AVATAR//2 - 2
+        d.line([(x_left, y), (x_right, y)], width=2, fill=COL_LINE_SIBLING)
 
     # ---- Nodo persona ----
-    def _draw_person_node(self, cedula, center):
+    def _draw_person_node(self, img, d, cedula, center):
         p = self.personas[cedula]
         x, y = center
         x0 = x - NODE_W//2
@@ -619,65 +992,35 @@ class FamTreeApp(tk.Toplevel):
         x1 = x + NODE_W//2
         y1 = y + NODE_H//2
 
-        # Sombra
-        self.canvas.create_rectangle(
-            x0+3, y0+4, x1+3, y1+4,
-            fill="#000000", outline="", stipple="gray25",
-            tags=("content",)
-        )
+        # Sombra (negro al 25%)
+        d.rectangle((x0+3, y0+4, x1+3, y1+4), fill=(0, 0, 0, 64))
 
         # Tarjeta redondeada
-        border_items = create_round_rect(
-            self.canvas, x0, y0, x1, y1, r=14,
-            fill=COL_NODE_FILL, outline=COL_NODE_BORDER, width=2
-        )
-        for it in border_items:
-            self.canvas.addtag_withtag("content", it)
+        d.rounded_rectangle((x0, y0, x1, y1), radius=14, fill=COL_NODE_FILL, outline=COL_NODE_BORDER, width=2)
 
         # Avatar
-        img = self._get_avatar_image(p.get("avatar"))
-        self.canvas.create_image(x, y - 18, image=img, tags=("content",))
-        if not hasattr(self, "_imgs"):
-            self._imgs = []
-        self._imgs.append(img)
+        av = self._get_avatar_pil(p.get("avatar"))
+        img.paste(av, (x - AVATAR//2, y - 18 - AVATAR//2), av)
 
         # Texto: nombre (con ✝ si falleció)
         falle = p.get("falle", "")
         falle_icon = " ✝" if falle else ""
         label = p.get("nombre", "") + falle_icon
-        self.canvas.create_text(
-            x, y + AVATAR//2 - 4,
-            text=label, font=("Georgia", 10, "bold"),
-            fill=COL_NODE_TEXT, tags=("content",)
-        )
-
-        # Área clicable para tooltip
-        clickable = self.canvas.create_rectangle(
-            x0, y0, x1, y1, outline="", fill="", tags=("content",)
-        )
-        self.node_hitmap[clickable] = cedula
+        d.text((x, y + AVATAR//2 - 4), label, font=self._tree_font, fill=COL_NODE_TEXT, anchor="mm")
 
         # Indicador de adopción (puntito verde)
         if str(self.personas[cedula].get("adoptado","")).strip():
             r = 6
-            self.canvas.create_oval(x1-2*r-4, y0+4, x1-4, y0+2*r+4, fill="#1db954", outline="", tags=("content",))
+            d.ellipse((x1-2*r-4, y0+4, x1-4, y0+2*r+4), fill="#1db954")
 
-    def _get_avatar_image(self, avatar_name):
+    def _get_avatar_pil(self, avatar_name):
+        # Una sola imagen 80x80 por archivo, compartida por todas las personas que lo usan
         path = os.path.join(AVATAR_DIR, avatar_name or "")
-        key = (path, AVATAR)
-        if key in self.avatar_cache:
-            return self.avatar_cache[key]
-        try:
-            im = Image.open(path).convert("RGBA").resize((AVATAR, AVATAR), Image.Resampling.LANCZOS)
-        except Exception:
-            im = Image.new("RGBA", (AVATAR, AVATAR), (0, 0, 0, 0))
-            d = ImageDraw.Draw(im)
-            r = AVATAR//2 - 2
-            cx = cy = AVATAR//2
-            d.ellipse((cx-r, cy-r, cx+r, cy+r), fill=(255, 243, 216, 255), outline=(141, 110, 99, 255), width=2)
-        tkimg = ImageTk.PhotoImage(im)
-        self.avatar_cache[key] = tkimg
-        return tkimg
+        im = self._pil_avatar_cache.get(path)
+        if im is None:
+            im = _open_avatar(path) or self._avatar_placeholder
+            self._pil_avatar_cache[path] = im
+        return im
 
     # --------- Zoom (solo contenido) ----------
     def _on_zoom(self, event):
@@ -695,32 +1038,71 @@ class FamTreeApp(tk.Toplevel):
     def _apply_zoom(self, factor, event):
         new_scale = self.zoom_scale * factor
         new_scale = max(0.5, min(2.5, new_scale))
-        factor = new_scale / self.zoom_scale
+        if new_scale == self.zoom_scale:
+            return
+
+        # Punto del contenido bajo el cursor (antes del zoom)
+        old_z = self._tile_zoom()
+        cx = self.canvas.canvasx(event.x) / old_z
+        cy = self.canvas.canvasy(event.y) / old_z
         self.zoom_scale = new_scale
+        z = self._tile_zoom()
+        if z == old_z:
+            return  # mismo escalón de teselas: nada cambia en pantalla
 
-        x = self.canvas.canvasx(event.x)
-        y = self.canvas.canvasy(event.y)
+        # Teselas del nuevo escalón (las anteriores quedan en la caché)
+        self._show_tiles()
 
-        # Escalar solo el contenido
-        self.canvas.scale("content", x, y, factor, factor)
-        x0, y0, x1, y1 = self.canvas.bbox("content")
-        if x0 is not None:
-            self.canvas.config(scrollregion=(0, 0, max(self._content_w, x1), max(self._content_h, y1)))
+        # Mantener ese punto bajo el cursor (scrollregion = contenido escalado, sin bbox)
+        sw = max(int(self._content_w * z), self.canvas.winfo_width())
+        sh = max(int(self._content_h * z), self.canvas.winfo_height())
+        self.canvas.xview_moveto(max(0.0, cx * z - event.x) / sw)
+        self.canvas.yview_moveto(max(0.0, cy * z - event.y) / sh)
 
     # --------- Tooltips ----------
     def _on_motion(self, event):
-        x = self.canvas.canvasx(event.x)
-        y = self.canvas.canvasy(event.y)
-        items = self.canvas.find_overlapping(x, y, x, y)
-        for it in items[::-1]:
-            if it in self.node_hitmap:
-                ced = self.node_hitmap[it]
-                p = self.personas.get(ced, {})
-                txt = self._tooltip_text(p)
-                self.tooltip.show(txt, event.x_root, event.y_root)
-                return
+        # Movimientos de menos de 3px no cambian nada
+        last = self._last_motion_xy
+        if last and abs(event.x - last[0]) + abs(event.y - last[1]) < 3:
+            return
+        self._last_motion_xy = (event.x, event.y)
+
+        # Ráfagas de movimiento: solo se procesa la última posición
+        if self._motion_after is not None:
+            self.after_cancel(self._motion_after)
+        self._motion_after = self.after(30, self._process_motion, event.x, event.y, event.x_root, event.y_root)
+
+    def _process_motion(self, ex, ey, x_root, y_root):
+        self._motion_after = None
+        ced = self._hit_test(ex, ey)
+        if ced and ced == self._last_hover_ced and self.tooltip.tip is not None:
+            self.tooltip.move(x_root, y_root)  # mismo nodo: solo reubicar
+            return
+        self._last_hover_ced = ced
+        if ced:
+            p = self.personas.get(ced, {})
+            txt = self._tooltip_text(p)
+            self.tooltip.show(txt, x_root, y_root)
+            return
+        self.tooltip.hide()
+
+    def _on_leave(self, _event):
+        if self._motion_after is not None:
+            self.after_cancel(self._motion_after)
+            self._motion_after = None
+        self._last_hover_ced = None
         self.tooltip.hide()
 
+    def _hit_test(self, ex, ey):
+        """Cédula del nodo bajo el puntero (coordenadas de ventana) o None."""
+        s, ox, oy = self._view_tf
+        x = (self.canvas.canvasx(ex) - ox) / s
+        y = (self.canvas.canvasy(ey) - oy) / s
+        for x0, y0, x1, y1, ced in self._grid.get((int(x // HIT_CELL), int(y // HIT_CELL)), ()):
+            if x0 <= x <= x1 and y0 <= y <= y1:
+                return ced
+        return None
+
     def _fmt_names(self, ids):
         lst = [c for c in ids if c]
         if not lst:
@@ -728,6 +1110,14 @@ class FamTreeApp(tk.Toplevel):
         return "; ".join(f"{c} - {self.personas.get(c, {}).get('nombre', c)}" for c in sorted(set(lst)))
 
     def _tooltip_text(self, p):
+        # Mientras los datos no cambien, el texto de cada persona es siempre el mismo
+        ced = p.get("cedula", "")
+        txt = self._tooltip_cache.get(ced)
+        if txt is None:
+            txt = self._tooltip_cache[ced] = self._build_tooltip_text(p)
+        return txt
+
+    def _build_tooltip_text(self, p):
         # Info básica
         lines = [
             f"Nombre: {p.get('nombre','')}",
@@ -744,8 +1134,8 @@ class FamTreeApp(tk.Toplevel):
         if p.get("provincia"):
             lines.append(f"Provincia: {p.get('provincia')}")
 
-        padre = self._id_from_combo(p.get("padre"))
-        madre = self._id_from_combo(p.get("madre"))
+        padre = p.get("padre_id", "")
+        madre = p.get("madre_id", "")
         if padre:
             lines.append(f"Padre: {self.personas.get(padre,{}).get('nombre','')}")
         if madre:
@@ -754,28 +1144,25 @@ class FamTreeApp(tk.Toplevel):
         # Parentescos (Kinship)
         ced = p.get("cedula", "")
         if hasattr(self, "kin") and ced:
-            lines.append("Hijos/as: " + self._fmt_names(self.kin.get_children(ced)))
-            sp = self.kin.get_spouse(ced)
-            lines.append("Pareja: " + (self._fmt_names([sp]) if sp else "-"))
-            lines.append("Hermanos/as (completos): " + self._fmt_names(self.kin.full_siblings(ced)))
-            lines.append("Medio hermanos/as: " + self._fmt_names(self.kin.half_siblings(ced)))
-            lines.append("Abuelos/as: " + self._fmt_names(self.kin.grandparents(ced)))
-            lines.append("Nietos/as: " + self._fmt_names(self.kin.grandchildren(ced)))
-            lines.append("Tíos/Tías (políticos incluidos): " + self._fmt_names(self.kin.uncles_aunts(ced, include_inlaws=True)))
-            lines.append("Primos/as: " + self._fmt_names(self.kin.cousins(ced)))
-            lines.append("Sobrinos/as: " + self._fmt_names(self.kin.nieces_nephews(ced)))
+            k = self._kin_precomputed.get(ced) or self.kin.precompute_all([ced])[ced]
+            lines.append("Hijos/as: " + self._fmt_names(k.children))
+            lines.append("Pareja: " + (self._fmt_names([k.spouse]) if k.spouse else "-"))
+            lines.append("Hermanos/as (completos): " + self._fmt_names(k.full_siblings))
+            lines.append("Medio hermanos/as: " + self._fmt_names(k.half_siblings))
+            lines.append("Abuelos/as: " + self._fmt_names(k.grandparents))
+            lines.append("Nietos/as: " + self._fmt_names(k.grandchildren))
+            lines.append("Tíos/Tías (políticos incluidos): " + self._fmt_names(k.uncles_aunts))
+            lines.append("Primos/as: " + self._fmt_names(k.cousins))
+            lines.append("Sobrinos/as: " + self._fmt_names(k.nieces_nephews))
 
         return "\n".join(lines)
 
     # --------- Exportar PNG ----------
     def _export_png(self):
         try:
-            x0, y0, x1, y1 = self.canvas.bbox("content")
-            if not (x0 or y0 or x1 or y1):
+            if not self._positions:
                 messagebox.showerror("Exportar", "No hay contenido para exportar.")
                 return
-            w = int(x1 - x0)
-            h = int(y1 - y0)
 
             ps = filedialog.asksaveasfilename(
                 title="Guardar como",
@@ -785,41 +1172,53 @@ class FamTreeApp(tk.Toplevel):
             if not ps:
                 return
 
-            tmp_eps = ps.replace(".png", ".eps")
-
-            self.canvas.postscript(file=tmp_eps, colormode="color", pagewidth=w-1, pageheight=h-1)
-            img = Image.open(tmp_eps)
-            img.load()
-            img = img.convert("RGBA")
-            img.save(ps, "PNG")
-            try:
-                os.remove(tmp_eps)
-            except Exception:
-                pass
-
-            messagebox.showinfo("Exportar", f"Imagen exportada en:\n{ps}")
+            # El árbol se pinta con PIL directamente (sin EPS ni Ghostscript)
+            img = self._render_tree_to_image()
+            # Fondo + compresión en segundo plano
+            threading.Thread(target=self._finish_export, args=(img, ps), daemon=True).start()
         except Exception as e:
             messagebox.showerror("Exportar", f"No se pudo exportar la imagen.\nDetalle: {e}")
 
+    def _finish_export(self, img, ps):
+        """Corre en un hilo aparte: fondo + PNG. Los mensajes vuelven al hilo UI vía after()."""
+        try:
+            out = Image.new("RGB", img.size, COL_CANVAS)
+            if BG_PATH and os.path.exists(BG_PATH):
+                try:
+                    base = Image.open(BG_PATH).convert("RGB")
+                    bw, bh = base.size
+                    scale = max(img.width / bw, img.height / bh)
+                    base = base.resize((max(1, int(bw * scale)), max(1, int(bh * scale))), Image.Resampling.LANCZOS)
+                    x_left = (base.width - img.width) // 2
+                    y_top = (base.height - img.height) // 2
+                    out = base.crop((x_left, y_top, x_left + img.width, y_top + img.height))
+                except Exception:
+                    pass
+            out.paste(img, (0, 0), img)
+            out.save(ps, "PNG", optimize=True)
+            self.after(0, lambda: messagebox.showinfo("Exportar", f"Imagen exportada en:\n{ps}"))
+        except Exception as e:
+            err = e
+            self.after(0, lambda: messagebox.showerror("Exportar", f"No se pudo exportar la imagen.\nDetalle: {err}"))
+
     # --------- Simulación: start / stop (3 motores) ----------
     def _start_sim(self):
         # Evita doble inicio
-        if getattr(self, "_sim_running", False):
+        if self._sim_running.is_set():
             return
         try:
-            # Arranca motores si existen
-            if hasattr(self, "birthday"): self.birthday.start()
-            if hasattr(self, "births"):   self.births.start()
-            if hasattr(self, "deaths"):   self.deaths.start()
-            if hasattr(self, "unions"): self.unions.start() 
-            if hasattr(self, "emotions"): self.emotions.start()
-
-            self._sim_running = True
+            # Arranca motores en serie: start() solo lanza el hilo de cada motor y
+            # stop() solo activa su Event, así que ninguno bloquea al siguiente
+            for e in self._engines:
+                e.start()
+
+            self._sim_running.set()
             self.btn_start.config(state="disabled")
             self.btn_stop.config(state="normal")
 
             # El contador de UI lo basamos en el periodo del motor de cumpleaños
             self._countdown = getattr(self.birthday, "segundos_por_tick", 10)
+            self._next_tick_ts = time.monotonic() + self._countdown
 
             # Loops de UI
             self._tick_timer_loop()
@@ -830,103 +1229,191 @@ class FamTreeApp(tk.Toplevel):
 
 
     def _stop_sim(self):
-        if not getattr(self, "_sim_running", False):
+        if not self._sim_running.is_set():
             return
         try:
-            # Detén en orden (no es crítico, pero ayuda)
-            if hasattr(self, "deaths"):   self.deaths.stop()
-            if hasattr(self, "birthday"): self.birthday.stop()
-            if hasattr(self, "births"): self.births.stop()
-            if hasattr(self, "unions"): self.unions.stop()
-            if hasattr(self, "emotions"): self.emotions.stop()
+            for e in self._engines:
+                e.stop()
         except Exception:
             pass
 
-        self._sim_running = False
+        self._sim_running.clear()
         self.btn_start.config(state="normal")
         self.btn_stop.config(state="disabled")
         self._toast("⏸ Simulación detenida")
 
 
     def _on_sim_change(self):
-        self.after(0, self._redraw)
+        """Llamado desde hilos de los motores → solo marca; el hilo UI redibuja al drenar."""
+        self._redraw_pending.set()
+
+    # Eventos tras los que alguien puede volver a estar disponible para una unión
+    _UNION_REFRESH_EVENTS = frozenset({"viudez", "separacion"})
 
     def _on_sim_event(self, tipo, payload):
-        """Llamado desde hilos de los motores → brincar a hilo UI."""
-        self.after(0, self._handle_event, tipo, payload)
+        """Llamado desde hilos de los motores → se encola; el hilo UI lo drena."""
+        self._evt_dq.append((tipo, payload))
+        if tipo in self._UNION_REFRESH_EVENTS:
+            unions = getattr(self, "unions", None)
+            if unions is not None and payload.get("cedula"):
+                unions.notify_person_changed(payload["cedula"])
+
+    def _drain_events(self):
+        pending_logs = []
+        try:
+            while self._evt_dq:
+                try:
+                    tipo, payload = self._evt_dq.popleft()
+                except IndexError:
+                    break
+                self._handle_event(tipo, payload)
+                if self._event_panel_open.is_set():
+                    pending_logs.append((tipo, payload))
+
+            # --- PANEL DE EVENTOS (si está abierto): un solo lote por drenado ---
+            if pending_logs and self._event_panel_open.is_set():
+                try:
+                    anio = getattr(self.birthday, "anio_sim", None) or getattr(self.deaths, "anio_sim", None) or 0
+                    self._event_panel.log_events([(anio, t, p) for t, p in pending_logs], self.personas)
+                except Exception:
+                    pass
+
+            # Varios avisos de los motores entre dos drenados → un solo redibujo
+            if self._redraw_pending.is_set():
+                self._redraw_pending.clear()
+                self._redraw()
+        finally:
+            self._drain_after = self.after(30, self._drain_events)
 
     def _tick_timer_loop(self):
-        if not self._sim_running:
+        if not self._sim_running.is_set():
             self._update_timer_ui()
             return
-        self._countdown -= 1
-        if self._countdown <= 0:
-            self._countdown = self.birthday.segundos_por_tick
-        self._update_timer_ui()
-        self.after(1000, self._tick_timer_loop)
+        # Restante calculado con reloj monotónico: no deriva si la UI se traba
+        spt = self.birthday.segundos_por_tick
+        now = time.monotonic()
+        r = int(self._next_tick_ts - now)
+        if r <= 0:
+            # Tras una traba más larga que un periodo se saltan de una vez los vencidos
+            while self._next_tick_ts - now < 1:
+                self._next_tick_ts += spt
+            r = int(self._next_tick_ts - now)
+        if r != self._countdown:
+            self._countdown = r
+            self._update_timer_ui()
+        self.after(250, self._tick_timer_loop)
 
-    def _update_timer_ui(self):
+    def _update_timer_ui(self, force: bool = False):
         try:
             anio = self.birthday.anio_sim
         except Exception:
             anio = None
         anio_txt = str(anio) if anio else "—"
         c = max(0, int(self._countdown)) if hasattr(self, "_countdown") else "—"
-        self.lbl_timer.config(text=f"Año sim: {anio_txt}  | Próximo tick: {c}s")
+        txt = f"Año sim: {anio_txt}  | Próximo tick: {c}s"
+        if txt == self._last_timer_txt:
+            return
+        # Sin redibujar si la ventana está minimizada o el label no se ve
+        if not force and (self.state() == "iconic" or not self.lbl_timer.winfo_ismapped()):
+            return
+        self._last_timer_txt = txt
+        self.after_idle(lambda: self.lbl_timer.config(text=txt))
+
+    # --- Handlers de eventos (uno por tipo) ---
+    def _nombre_evento(self, payload):
+        # Los motores ya envían el nombre: el hilo UI no consulta self.personas
+        return payload.get("nombre") or payload.get("cedula") or "¿?"
+
+    _FMT_FALLECE = "💀 Falleció {nom}{extra}{fecha_txt}"
+    _FMT_VIUDEZ = "🖤 {nom} ha quedado viudo/a"
+    _FMT_UNION = "❤️ {}"
+    _FMT_HIJO = "🍼 {}"
+    _FMT_NACE = "🍼 Nacimiento: {}"
+    _FMT_TUTORIA = "🟢 {}"
+    _FMT_SEPARACION = "💔 {}"
+    _FMT_SALUD = "😟 Salud emocional {nivel} ({valor})"
+    _FMT_CUMPLE = "🎂 {nom} {detalle}"
+
+    def _h_fallece(self, payload):
+        nom = self._nombre_evento(payload)
+        edad = payload.get("edad")
+        fecha = payload.get("fecha")
+        extra = f" a los {edad}" if isinstance(edad, int) else ""
+        fecha_txt = f" ({fecha})" if fecha else ""
+        self._toast(self._FMT_FALLECE.format(nom=nom, extra=extra, fecha_txt=fecha_txt))
+
+    def _h_viudez(self, payload):
+        nom = self._nombre_evento(payload)
+        self._toast(self._FMT_VIUDEZ.format(nom=nom))
+
+    def _h_union(self, payload):
+        self._toast(self._FMT_UNION.format(payload.get("detalle", "Se unieron")))
+
+    def _h_hijo(self, payload):
+        self._toast(self._FMT_HIJO.format(payload.get("detalle", "Nace un bebé")))
+
+    def _h_nace(self, payload):
+        self._toast(self._FMT_NACE.format(payload.get("nombre_bebe", "Bebé")))
+
+    def _h_tutoria(self, payload):
+        self._toast(self._FMT_TUTORIA.format(payload.get("detalle", "Tutoría asignada")))
+
+    def _h_separacion(self, payload):
+        self._toast(self._FMT_SEPARACION.format(payload.get("detalle", "Separación")))
+
+    def _h_salud(self, payload):
+        self._toast(self._FMT_SALUD.format(nivel=payload.get("nivel", ""), valor=payload.get("valor", "")))
+
+    def _h_cumple(self, payload):
+        self._toast(self._FMT_CUMPLE.format(nom=self._nombre_evento(payload), detalle=payload.get("detalle", "cumple años")))
+
+    _HANDLERS = {
+        "fallece": _h_fallece,
+        "viudez": _h_viudez,
+        "union": _h_union,
+        "hijo": _h_hijo,
+        "nace": _h_nace,
+        "tutoria": _h_tutoria,
+        "separacion": _h_separacion,
+        "salud_baja": _h_salud,
+        "cumpleaños": _h_cumple,
+    }
+
+    def _rebuild_subscriptions(self, *_):
+        """Tipos de evento que generan toast según las preferencias del usuario."""
+        tipos = set(self._HANDLERS)
+        if not self.var_show_cumples.get():
+            tipos.discard("cumpleaños")
+        self._subscribed_types = frozenset(tipos)
 
     def _handle_event(self, tipo, payload):
-        # --- TOASTS
-        ced = payload.get("cedula")
-        p = self.personas.get(ced, {})
-        nombre = p.get("nombre", ced or "¿?")
-
-        if tipo == "fallece":
-            nom = payload.get("nombre") or nombre
-            edad = payload.get("edad")
-            fecha = payload.get("fecha")
-            extra = f" a los {edad}" if isinstance(edad, int) else ""
-            fecha_txt = f" ({fecha})" if fecha else ""
-            self._toast(f"💀 Falleció {nom}{extra}{fecha_txt}")
-
-        elif tipo == "viudez":
-            nom = payload.get("nombre") or nombre
-            self._toast(f"🖤 {nom} ha quedado viudo/a")
-
-        elif tipo == "union":
-            self._toast(f"❤️ {payload.get('detalle','Se unieron')}")
-
-        elif tipo in ("hijo", "nace"):
-            if tipo == "nace":
-                self._toast(f"🍼 Nacimiento: {payload.get('nombre_bebe','Bebé')}")
-            else:
-                self._toast(f"🍼 {payload.get('detalle','Nace un bebé')}")
+        # --- TOASTS (despacho por tipo; los silenciados no hacen nada)
+        if tipo in self._subscribed_types:
+            self._HANDLERS[tipo](self, payload)
 
-        elif tipo == "tutoria":
-            self._toast(f"🟢 {payload.get('detalle','Tutoría asignada')}")
-
-        elif tipo == "separacion":
-            self._toast(f"💔 {payload.get('detalle','Separación')}")
-
-        elif tipo == "salud_baja":
-            nivel = payload.get("nivel","")
-            val = payload.get("valor","")
-            self._toast(f"😟 Salud emocional {nivel} ({val})")
-
-        elif tipo == "cumpleaños":
-            # si quieres silenciar cumples, comenta este bloque:
-            if getattr(self, "var_show_cumples", None) and self.var_show_cumples.get():
-                self._toast(f"🎂 {nombre} {payload.get('detalle','cumple años')}")
+    def _on_main_configure(self, event):
+        # <Configure> también llega por cada hijo de la ventana
+        if event.widget is not self:
+            return
+        key = (event.x, event.y, event.width, event.height)
+        if key == self._toast_geom_key:
+            return
+        self._toast_geom_key = key
+        rx = self.winfo_rootx()
+        ry = self.winfo_rooty()
+        self._toast_xy = (rx + event.width - TOAST_W - 20, ry + event.height - TOAST_H - 20)
 
-        # --- PANEL DE EVENTOS (si está abierto) ---
-        if getattr(self, "_event_panel", None) and self._event_panel.winfo_exists():
+    def _toast(self, text, duration_ms: int = 3500):
+        # Máximo MAX_TOASTS vivos: el más viejo se cierra antes de abrir otro
+        while len(self._live_toasts) >= MAX_TOASTS:
+            old = self._live_toasts.popleft()
             try:
-                anio = getattr(self.birthday, "anio_sim", None) or getattr(self.deaths, "anio_sim", None) or 0
-                self._event_panel.log_event(anio, tipo, payload, self.personas)
+                old.destroy()
             except Exception:
                 pass
 
-    def _toast(self, text, duration_ms: int = 3500):
         top = tk.Toplevel(self)
+        self._live_toasts.append(top)
         top.overrideredirect(True)
         top.attributes("-topmost", True)
         try:
@@ -939,16 +1426,15 @@ class FamTreeApp(tk.Toplevel):
         lbl = tk.Label(frm, text=text, bg="#222", fg="#fff", padx=14, pady=10, font=("Segoe UI", 10, "bold"), justify="left")
         lbl.pack()
 
-        self.update_idletasks()
-        sw = self.winfo_width()
-        sh = self.winfo_height()
-        rx = self.winfo_rootx()
-        ry = self.winfo_rooty()
-        w = 360
-        h = 60
-        x = rx + sw - w - 20
-        y = ry + sh - h - 20
-        top.geometry(f"{w}x{h}+{x}+{y}")
+        x, y = self._toast_xy
+        top.geometry(f"{TOAST_W}x{TOAST_H}+{x}+{y}")
+
+        self.after(duration_ms, self._close_toast, top)
 
-        top.after(duration_ms, top.destroy)
+    def _close_toast(self, top):
+        try:
+            self._live_toasts.remove(top)
+        except ValueError:
+            return  # ya se cerró por el tope
+        top.destroy()
 
@@ -1,15 +1,22 @@
 # uniones.py
 from __future__ import annotations
 
+import bisect
+import heapq
+import logging
 import threading
 import time
 import random
-from datetime import datetime, date
-from typing import Callable, Dict, List, Optional, Any, Tuple
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Any, Tuple
+from fechas import parse_date_any as _parse_date_any
 from dataclasses import dataclass
 import os
 import io
+import queue
 import shutil
+import stat
+from functools import lru_cache
 
 # --- historial (sidecar) ---
 # Se importará localmente en el punto de uso para no romper si history.py no está aún.
@@ -19,6 +26,16 @@ Persona   = Dict[str, Any]
 OnChange  = Optional[Callable[[], None]]
 OnEvent   = Optional[Callable[[str, Dict], None]]
 GetYearCB = Optional[Callable[[], int]]  # para sincronizar con BirthdayEngine si se pasa
+# Soltero elegible ya proyectado: (cédula, edad en el año simulado, campos parseados)
+Eligible  = Tuple[str, int, Dict[str, Any]]
+
+_log = logging.getLogger(__name__)
+# Un tick fallido se registra como mucho una vez por este intervalo (segundos)
+_TICK_ERROR_LOG_SECS = 60.0
+
+# Cada cuántos ticks se recorre de nuevo a toda la población buscando elegibles
+# (entre medias solo se revalida a los que ya lo eran)
+_ELIG_RESCAN_TICKS = 6
 
 
 # ---------- Utilidades ----------
@@ -28,27 +45,21 @@ def _safe_int(x, default: Optional[int] = None) -> Optional[int]:
     except Exception:
         return default
 
-def _parse_date_any(s: str) -> Optional[date]:
-    if not s:
-        return None
-    s = str(s).strip()
-    for f in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d"):
-        try:
-            return datetime.strptime(s, f).date()
-        except Exception:
-            pass
-    return None
-
 def _id_from_combo(text: str) -> str:
     """'123 - Nombre' -> '123' ; '123' -> '123' ; '' -> ''"""
     if not text:
         return ""
-    t = str(text).strip()
-    return t.split(" - ")[0].strip()
+    return _id_from_combo_str(str(text))
+
+@lru_cache(maxsize=8192)
+def _id_from_combo_str(text: str) -> str:
+    # partition corta en el primer " - " sin construir la lista entera
+    return text.strip().partition(" - ")[0].strip()
 
 def _idname(ced: str, nombre: str) -> str:
     return f"{ced} - {nombre or ''}".strip()
 
+@lru_cache(maxsize=4096)
 def _norm_gender(g: str) -> Optional[str]:
     if not g:
         return None
@@ -83,148 +94,208 @@ def _age_of(p: Persona, year_now: int) -> Optional[int]:
     d = _parse_date_any(p.get("nac", ""))
     return max(0, year_now - d.year) if d else None
 
-def _list_from_csv(val: Any) -> List[str]:
+def _list_from_csv(val: Any) -> Tuple[str, ...]:
     if not val:
-        return []
+        return ()
     if isinstance(val, list):
-        return [str(x).strip().lower() for x in val if str(x).strip()]
-    return [x.strip().lower() for x in str(val).split(",") if x.strip()]
+        return tuple(str(x).strip().lower() for x in val if str(x).strip())
+    return _csv_tokens(str(val))
 
-def _compute_compatibility(a: Persona, b: Persona) -> float:
-    """
-    Índice 0..1:
-    - Afinidades/intereses en común (hasta 0.8)
-    - Bonificación cercanía de edad (0.1)
-    - Bonificación misma provincia (0.1)
-    Considera *al menos dos tipos de afinidad* si existen en datos.
-    """
-    A = set(_list_from_csv(a.get("afinidades") or a.get("intereses")))
-    B = set(_list_from_csv(b.get("afinidades") or b.get("intereses")))
-    if A or B:
-        inter = len(A & B)
-        union = max(1, len(A | B))
-        aff = inter / union
-        if inter >= 2:
-            aff = min(1.0, aff + 0.1)
-    else:
-        aff = 0.5  # desconocido → término medio
-
-    ea = _age_of(a, datetime.now().year) or 0
-    eb = _age_of(b, datetime.now().year) or 0
-    age_bonus = 1.0 - min(1.0, (abs(ea - eb) / 20.0))   # 0..1
-    age_bonus *= 0.1
-
-    prov_bonus = 0.1 if (a.get("provincia") and a.get("provincia") == b.get("provincia")) else 0.0
-    score = 0.8 * aff + age_bonus + prov_bonus
-    return max(0.0, min(1.0, score))
+@lru_cache(maxsize=4096)
+def _csv_tokens(text: str) -> Tuple[str, ...]:
+    # lower() una sola vez sobre el texto; tupla para que el resultado cacheado sea inmutable
+    return tuple(t for t in (x.strip() for x in text.lower().split(",")) if t)
+
+def _intern(table: Dict[Any, int], key: Any) -> int:
+    """Código entero estable de `key` dentro de `table` (0, 1, 2, ...)."""
+    code = table.get(key)
+    if code is None:
+        code = table[key] = len(table)
+    return code
+
+def _aff_mask(tokens: Iterable[str], table: Dict[str, int]) -> int:
+    """Afinidades como máscara de bits: un bit por token internado en `table`."""
+    m = 0
+    for t in tokens:
+        m |= 1 << _intern(table, t)
+    return m
 
 
 # ---------- Reglas anti-incesto ampliadas ----------
+# Sobre una tabla de padres precalculada (una vez por tick)
 def _parents_of(p: Persona) -> Tuple[str, str]:
     return (_id_from_combo(p.get("padre", "")), _id_from_combo(p.get("madre", "")))
 
-def _build_ancestors(personas: Dict[str, Persona], start_id: str, depth: int = 2) -> set:
+_NO_PARENTS: Tuple[str, str] = ("", "")
+
+def _ancestors2(parents: Dict[Any, Tuple[Any, Any]], ced: Any) -> set:
+    """Padres y abuelos de `ced` según la tabla."""
+    out = {x for x in parents.get(ced, _NO_PARENTS) if x}
+    for x in list(out):
+        out.update(y for y in parents.get(x, _NO_PARENTS) if y)
+    return out
+
+def _genetically_safe_tbl(parents: Dict[Any, Tuple[Any, Any]], anc2: Dict[Any, set], a_id: Any, b_id: Any) -> bool:
     """
-    Retorna IDs de ancestros hasta 'depth' generaciones.
-    depth=1 -> padres; depth=2 -> abuelos también.
+    Evita consanguinidad directa y de 1er grado extendida: padre/madre-hijo, hermanos
+    y medio hermanos, abuelos-nietos, tíos-sobrinos y primos hermanos.
+    `anc2` es un memo por tick de _ancestors2. Los ids pueden ser cédulas o enteros
+    internados; el vacío ("" o 0) debe ser falso.
     """
-    seen = set()
-    frontier = {start_id}
-    for _ in range(depth):
-        nxt = set()
-        for pid in list(frontier):
-            p = personas.get(pid)
-            if not p:
-                continue
-            fa, mo = _parents_of(p)
-            for x in (fa, mo):
-                if x and x not in seen:
-                    seen.add(x)
-                    nxt.add(x)
-        frontier = nxt
-        if not frontier:
-            break
-    return seen
-
-def _siblings(personas: Dict[str, Persona], a_id: str, b_id: str) -> bool:
-    A = personas.get(a_id) or {}
-    B = personas.get(b_id) or {}
-    ap = _parents_of(A)
-    bp = _parents_of(B)
-    # hermanos o medio hermanos (comparten padre o madre)
-    if (ap[0] and ap[0] == bp[0]) or (ap[1] and ap[1] == bp[1]):
+    # Atajo (caso común): cada regla exige un ancestro común hasta abuelos o que uno sea
+    # ancestro del otro; si {a}+ancestros(a) y {b}+ancestros(b) no se tocan, es seguro.
+    anc_a = anc2.get(a_id)
+    if anc_a is None:
+        anc_a = anc2[a_id] = _ancestors2(parents, a_id)
+    anc_b = anc2.get(b_id)
+    if anc_b is None:
+        anc_b = anc2[b_id] = _ancestors2(parents, b_id)
+    if b_id not in anc_a and a_id not in anc_b and anc_a.isdisjoint(anc_b):
         return True
-    # si ambos padres coinciden y existen
-    return ap == bp and any(ap)
-
-def _aunt_uncle_niece_nephew(personas: Dict[str, Persona], a_id: str, b_id: str) -> bool:
-    """True si A es tío/tía de B o B de A."""
-    # A es hermano de un padre de B  -> tío/tía
-    B = personas.get(b_id) or {}
-    bp = set([_id_from_combo(B.get("padre","")), _id_from_combo(B.get("madre",""))])
-    for parent_id in [x for x in bp if x]:
-        if _siblings(personas, a_id, parent_id):
-            return True
-    # simétrico
-    A = personas.get(a_id) or {}
-    ap = set([_id_from_combo(A.get("padre","")), _id_from_combo(A.get("madre",""))])
-    for parent_id in [x for x in ap if x]:
-        if _siblings(personas, b_id, parent_id):
-            return True
-    return False
-
-def _first_cousins(personas: Dict[str, Persona], a_id: str, b_id: str) -> bool:
-    """Primos hermanos: los padres de A y B son hermanos entre sí."""
-    A = personas.get(a_id) or {}
-    B = personas.get(b_id) or {}
-    ap = [x for x in _parents_of(A) if x]
-    bp = [x for x in _parents_of(B) if x]
-    for pa in ap:
-        for pb in bp:
-            if _siblings(personas, pa, pb):
-                return True
-    return False
 
-def _genetically_safe(personas: Dict[str, Persona], a: Persona, b: Persona, a_id: str, b_id: str) -> bool:
-    """Reglas para evitar consanguinidad directa y de 1er grado extendida."""
-    # padre/madre con hijo
-    for parent, child in ((a, b), (b, a)):
-        pid = _id_from_combo(parent.get("cedula","") or (a_id if parent is a else b_id))
-        if _id_from_combo(child.get("padre","")) == pid:
-            return False
-        if _id_from_combo(child.get("madre","")) == pid:
-            return False
+    def sib(x: str, y: str) -> bool:
+        px = parents.get(x, _NO_PARENTS)
+        py = parents.get(y, _NO_PARENTS)
+        return bool((px[0] and px[0] == py[0]) or (px[1] and px[1] == py[1]))
 
+    pa = parents.get(a_id, _NO_PARENTS)
+    pb = parents.get(b_id, _NO_PARENTS)
+    # padre/madre con hijo
+    if a_id in pb or b_id in pa:
+        return False
     # hermanos o medio hermanos
-    if _siblings(personas, a_id, b_id):
+    if sib(a_id, b_id):
         return False
-
-    # abuelo/a ↔ nieto/a (ancestros hasta 2 generaciones)
-    a_anc = _build_ancestors(personas, a_id, depth=2)
-    b_anc = _build_ancestors(personas, b_id, depth=2)
-    if (a_id in b_anc) or (b_id in a_anc):
+    # abuelo/a ↔ nieto/a
+    if a_id in anc_b or b_id in anc_a:
         return False
-
     # tíos ↔ sobrinos
-    if _aunt_uncle_niece_nephew(personas, a_id, b_id):
+    if any(p and sib(a_id, p) for p in pb) or any(p and sib(b_id, p) for p in pa):
         return False
-
     # primos hermanos
-    if _first_cousins(personas, a_id, b_id):
+    if any(x and y and sib(x, y) for x in pa for y in pb):
         return False
-
     return True
 
 
+# Bonificación por cercanía de edad, por diferencia entera de edades (0..19)
+_AGE_BONUS: Tuple[float, ...] = tuple((1.0 - min(1.0, k / 20.0)) * 0.1 for k in range(20))
+
+def _scan_pairs(males: List[tuple], females: List[tuple], parents: Dict[int, Tuple[int, int]],
+                anc2: Dict[int, set], umbral: float) -> List[Tuple[float, int, int, str, str]]:
+    """
+    Núcleo de _collect_candidates. Filas: (i, cédula, edad, máscara de afinidades,
+    nº de afinidades, edad actual, provincia, id entero); `females` ordenadas por edad.
+    `parents` y `anc2` van por id entero (ver _get_parsed).
+    Devuelve (-score, i, j, a_id, b_id) de los pares sobre el umbral y seguros
+    (score negado: el orden natural de las tuplas es el de la clasificación).
+    Compatibilidad 0..1: afinidades en común (Jaccard, +0.1 con dos o más; hasta 0.8),
+    cercanía de edad (hasta 0.1) y misma provincia (0.1).
+    """
+    f_ages = [t[2] for t in females]
+    lo_of = bisect.bisect_left
+    hi_of = bisect.bisect_right
+    safe = _genetically_safe_tbl
+    ancestors = _ancestors2
+    age_tbl = _AGE_BONUS
+    out: List[Tuple[float, int, int, str, str]] = []
+    append = out.append
+    # Ventana de ±15 años por edad (no por hombre): los de la misma edad comparten la lista
+    windows: Dict[int, List[tuple]] = {}
+    for im, m_id, em, A, na, ea, prov_a, m_i in males:
+        window = windows.get(em)
+        if window is None:
+            window = windows[em] = females[lo_of(f_ages, em - 15):hi_of(f_ages, em + 15)]
+        for jf, f_id, _ef, B, nb, eb, prov_b, f_i in window:
+            # Sin llamadas a min/max: comparaciones en línea, mismos resultados
+            if A or B:
+                inter = bin(A & B).count("1")
+                aff = inter / (na + nb - inter)  # la unión es >= 1 si alguno tiene afinidades
+                if inter >= 2:
+                    aff += 0.1
+                    if aff > 1.0:
+                        aff = 1.0
+            else:
+                aff = 0.5
+            gap = ea - eb if ea >= eb else eb - ea
+            age_bonus = age_tbl[gap] if gap < 20 else 0.0
+            prov_bonus = 0.1 if (prov_a and prov_a == prov_b) else 0.0
+            score = 0.8 * aff + age_bonus + prov_bonus
+            if score > 1.0:
+                score = 1.0
+            if score < umbral:
+                continue
+            # Mismo orden (a, b) que el recorrido i < j sobre eligibles
+            if im < jf:
+                i, j, a_id, b_id, a_i, b_i = im, jf, m_id, f_id, m_i, f_i
+            else:
+                i, j, a_id, b_id, a_i, b_i = jf, im, f_id, m_id, f_i, m_i
+            # Atajo de _genetically_safe_tbl en línea (sin llamada) para el caso común
+            anc_a = anc2.get(a_i)
+            if anc_a is None:
+                anc_a = anc2[a_i] = ancestors(parents, a_i)
+            anc_b = anc2.get(b_i)
+            if anc_b is None:
+                anc_b = anc2[b_i] = ancestors(parents, b_i)
+            if (b_i not in anc_a and a_i not in anc_b and anc_a.isdisjoint(anc_b)) \
+                    or safe(parents, anc2, a_i, b_i):
+                append((-score, i, j, a_id, b_id))
+    return out
+
+
+class _Ranking:
+    """
+    Candidatos (score, a_id, b_id) de mayor a menor score, empates en el orden de los
+    pares. Se ordena bajo demanda: heapify es O(M) y un tick solo consume unos pocos,
+    así que se evita ordenar la lista completa. Se puede recorrer varias veces.
+    """
+    __slots__ = ("_heap", "_done")
+
+    def __init__(self, scored: List[Tuple[float, int, int, str, str]]):
+        heapq.heapify(scored)  # (-score, i, j, a_id, b_id)
+        self._heap = scored
+        self._done: List[Tuple[float, str, str]] = []
+
+    def _pop(self) -> Tuple[float, str, str]:
+        neg, _i, _j, a_id, b_id = heapq.heappop(self._heap)
+        item = (-neg, a_id, b_id)
+        self._done.append(item)
+        return item
+
+    def __len__(self) -> int:
+        return len(self._done) + len(self._heap)
+
+    def __getitem__(self, k: int) -> Tuple[float, str, str]:
+        while len(self._done) <= k and self._heap:
+            self._pop()
+        return self._done[k]
+
+    def __iter__(self):
+        k = 0
+        while True:
+            if k < len(self._done):
+                yield self._done[k]
+            elif self._heap:
+                yield self._pop()
+            else:
+                return
+            k += 1
+
+
+# Estados civiles que impiden una nueva unión (ya normalizados: strip + lower)
+_ESTADOS_BLOQUEO = frozenset({"casado", "casada", "casado/a", "unión libre", "union libre"})
+
 def _is_single(p: Persona) -> bool:
     """Disponible: sin pareja actual. Viudo/a permitido, divorciado/a, soltero/a."""
-    pareja = str(p.get("pareja","") or "").strip()
-    if pareja:
-        return False
-    est = str(p.get("estado","") or "").strip().lower()
-    if est in {"casado", "casada", "casado/a", "unión libre", "union libre"}:
+    pareja = p.get("pareja")
+    if pareja and str(pareja).strip():
         return False
-    return True
+    est = p.get("estado")
+    if not est:
+        return True
+    if not isinstance(est, str):
+        est = str(est)
+    return est.strip().lower() not in _ESTADOS_BLOQUEO
 
 def _id_or_empty(x: Any) -> str:
     return str(x or "").strip()
@@ -239,50 +310,79 @@ class TxtSchema:
     nombre_idx: int = 2     # "María López"
     pareja_idx: int = 11    # *** EN TU FORMATO: pareja está en la columna 11 (0..12) ***
 
-def _update_pareja_in_lines(lines: List[str], schema: TxtSchema, p: Persona, pareja_text: str) -> None:
+def _txt_snapshot(p: Persona) -> Persona:
+    """Copia de los campos que usa el escritor del TXT (el dict original sigue cambiando)."""
+    return {k: p[k] for k in ("cedula", "id", "nombre", "familia") if k in p}
+
+def _find_persona_line(lines: List[str], schema: TxtSchema, p: Persona, candidates: Optional[List[int]] = None) -> Optional[int]:
     """
-    Intenta ubicar la línea de 'p' y poner pareja_text en columna pareja_idx.
-    Criterios de match:
+    Índice de la línea de 'p' (o None). Criterios de match:
       - familia (texto exacto, con nombre): p["familia"]
       - id de persona (cedula/id): p["cedula"] o p["id"]
       - fallback por nombre si hiciera falta
+    `candidates` (opcional) limita la búsqueda a esas líneas; si ninguna coincide
+    se recorre el archivo completo.
     """
     fam_txt = str(p.get("familia","")).strip()
     pid = str(p.get("cedula") or p.get("id") or "").strip()
     pname = str(p.get("nombre","")).strip().lower()
+    need = max(schema.familia_idx, schema.persona_id_idx, schema.nombre_idx, schema.pareja_idx)
+
+    for rng in ((candidates, range(len(lines))) if candidates else (range(len(lines)),)):
+        for i in rng:
+            raw = lines[i]
+            if not raw.strip():
+                continue
+            parts = raw.rstrip("\n").split(schema.sep)
+            # Asegura longitud suficiente
+            if len(parts) <= need:
+                parts += [""] * (need + 1 - len(parts))
+
+            fam_ok = fam_txt and parts[schema.familia_idx].strip() == fam_txt
+            id_ok  = pid and parts[schema.persona_id_idx].strip() == pid
+            name_ok = pname and parts[schema.nombre_idx].strip().lower() == pname
+
+            if (fam_ok and (id_ok or name_ok)) or (id_ok and name_ok):
+                return i
+    return None
+
+def _with_pareja(raw: str, schema: TxtSchema, pareja_text: str) -> str:
+    """La misma línea con pareja_text en la columna pareja_idx."""
+    parts = raw.rstrip("\n").split(schema.sep)
+    need = max(schema.familia_idx, schema.persona_id_idx, schema.nombre_idx, schema.pareja_idx)
+    if len(parts) <= need:
+        parts += [""] * (need + 1 - len(parts))
+    parts[schema.pareja_idx] = pareja_text
+    return schema.sep.join(parts) + "\n"
 
-    for i, raw in enumerate(lines):
-        if not raw.strip():
-            continue
-        parts = raw.rstrip("\n").split(schema.sep)
-        # Asegura longitud suficiente
-        need = max(schema.familia_idx, schema.persona_id_idx, schema.nombre_idx, schema.pareja_idx)
-        if len(parts) <= need:
-            parts += [""] * (need + 1 - len(parts))
-
-        fam_ok = fam_txt and parts[schema.familia_idx].strip() == fam_txt
-        id_ok  = pid and parts[schema.persona_id_idx].strip() == pid
-        name_ok = pname and parts[schema.nombre_idx].strip().lower() == pname
-
-        if (fam_ok and (id_ok or name_ok)) or (id_ok and name_ok):
-            parts[schema.pareja_idx] = pareja_text
-            lines[i] = schema.sep.join(parts) + "\n"
-            break
-
-def _atomic_write(path: str, content: str, encoding: str = "utf-8") -> None:
+def _update_pareja_in_lines(lines: List[str], schema: TxtSchema, p: Persona, pareja_text: str) -> None:
+    """Intenta ubicar la línea de 'p' y poner pareja_text en columna pareja_idx."""
+    i = _find_persona_line(lines, schema, p)
+    if i is not None:
+        lines[i] = _with_pareja(lines[i], schema, pareja_text)
+
+def _atomic_write(path: str, content: str, encoding: str = "utf-8", mode: Optional[int] = None) -> None:
+    """
+    Escribe en un temporal y lo renombra sobre `path`. `mode` (permisos ya conocidos)
+    se aplica con fchmod sobre el descriptor abierto; sin él se copian de `path`.
+    """
     tmp = path + ".tmp"
     with io.open(tmp, "w", encoding=encoding, newline="") as f:
         f.write(content)
+        if mode is not None and hasattr(os, "fchmod"):
+            f.flush()
+            os.fchmod(f.fileno(), mode)
     try:
-        if os.path.exists(path):
+        if (mode is None or not hasattr(os, "fchmod")) and os.path.exists(path):
             shutil.copymode(path, tmp)
         os.replace(tmp, path)
-    finally:
-        if os.path.exists(tmp):
-            try:
-                os.remove(tmp)
-            except Exception:
-                pass
+    except Exception:
+        # Solo queda temporal si el reemplazo falló
+        try:
+            os.remove(tmp)
+        except Exception:
+            pass
+        raise
 
 
 # ---------- Motor de Uniones ----------
@@ -331,6 +431,17 @@ class UnionsEngine:
         self.personas_file = personas_file
         self.txt_schema = txt_schema or TxtSchema()
         self._encoding = encoding
+        # (firma mtime/tamaño, líneas, id -> [nº de línea], offsets en bytes) del TXT
+        self._txt_cache: Optional[Tuple[Tuple[int, int], List[str], Dict[str, List[int]], List[int]]] = None
+        # Uniones del tick pendientes de escribir (una sola escritura al final del tick)
+        self._pending_persist: List[Tuple[Persona, Persona]] = []
+        # Escritor en segundo plano: recibe lotes de uniones y los aplica al TXT.
+        # stop() escribe lo que quede en la cola; _io_lock serializa ambas escrituras
+        self._io_q: "queue.Queue[List[Tuple[Persona, Persona]]]" = queue.Queue()
+        self._io_thr: Optional[threading.Thread] = None
+        self._io_lock = threading.Lock()
+        # Permisos del TXT, leídos una vez (para no copiarlos en cada reescritura)
+        self._file_mode: Optional[int] = None
 
         # Año base
         if self.get_anio_sim is not None:
@@ -348,7 +459,23 @@ class UnionsEngine:
         # Contador robusto por año
         self._unions_by_year: Dict[int, int] = {}
 
+        # Campos estables ya parseados por cédula (ver _get_parsed)
+        self._pcache: Dict[str, Dict[str, Any]] = {}
+        # Elegibles del último recorrido: (año, lista) y ticks desde el último recorrido completo
+        self._elig_cache: Optional[Tuple[int, List[Eligible]]] = None
+        self._elig_ticks = 0
+        # Otro motor avisó que alguien pudo volverse elegible (ver notify_person_changed)
+        self._elig_dirty = False
+        # (año, elegibles con su edad) del último tick que no dio ningún candidato
+        self._barren_key: Optional[Tuple[int, Tuple[Tuple[str, int], ...]]] = None
+        # Textos internados a enteros: comparaciones int en vez de str
+        self._intern: Dict[str, Dict[Any, int]] = {"familia": {"": 0}, "prov": {None: 0, "": 0}, "aff": {}, "ced": {"": 0}}
+
+        # Eventos para la UI: se encolan bajo el lock y se despachan fuera de él
+        self._evt_q: "queue.Queue[Tuple[str, Dict]]" = queue.Queue(maxsize=256)
+
         # Hilo
+        self._last_tick_error = float("-inf")  # monotonic del último error registrado
         self._stop_evt = threading.Event()
         self._thr: Optional[threading.Thread] = None
         self._lock = threading.RLock()
@@ -364,25 +491,49 @@ class UnionsEngine:
         self._stop_evt.clear()
         self._thr = threading.Thread(target=self._run, name="UnionsEngineThread", daemon=True)
         self._thr.start()
+        if self.personas_file and not (self._io_thr and self._io_thr.is_alive()):
+            self._io_thr = threading.Thread(target=self._io_loop, name="UnionsWriterThread", daemon=True)
+            self._io_thr.start()
 
     def stop(self, wait: bool = False, timeout: Optional[float] = 1.5):
         self._stop_evt.set()
-        if wait and self._thr is not None:
-            try:
-                self._thr.join(timeout=timeout)
-            except Exception:
-                pass
+        # El escritor es daemon: lo encolado se escribe aquí para no perderlo al cerrar
+        batch = self._drain_io([])
+        if batch:
+            self._write_pending(batch)
+        if wait:
+            for thr in (self._thr, self._io_thr):
+                if thr is not None:
+                    try:
+                        thr.join(timeout=timeout)
+                    except Exception:
+                        pass
+
+    def notify_person_changed(self, ced: str):
+        """
+        Aviso de otro motor o de la UI: `ced` cambió (viudez, separación, datos editados)
+        y pudo volverse elegible. Se descarta su parseo y el próximo tick recorre de nuevo
+        a toda la población. Las bajas (uniones, muertes) no necesitan aviso.
+        """
+        self._pcache.pop(ced, None)
+        self._elig_dirty = True
 
     # ---- Bucle ----
     def _run(self):
         while not self._stop_evt.is_set():
             t0 = time.time()
+            changed = False
             try:
-                self._tick()
+                changed = self._tick()
             except Exception:
-                pass
-
-            if self.on_change:
+                # Un tick fallido no detiene el motor, pero deja rastro (sin inundar el log)
+                now = time.monotonic()
+                if now - self._last_tick_error >= _TICK_ERROR_LOG_SECS:
+                    self._last_tick_error = now
+                    _log.exception("UnionsEngine: falló un tick (año %s)", self._anio_sim)
+
+            # Solo se despierta a la UI si este tick hubo alguna unión
+            if changed and self.on_change:
                 try:
                     self.on_change()
                 except Exception:
@@ -390,155 +541,365 @@ class UnionsEngine:
 
             elapsed = time.time() - t0
             rest = max(0.05, self.segundos_por_tick - elapsed)
-            self._sleep_cancellable(rest)
-
-    def _sleep_cancellable(self, secs: float):
-        end = time.time() + secs
-        while time.time() < end and not self._stop_evt.is_set():
-            time.sleep(0.05)
+            # Event.wait bloquea sin sondeo y despierta en cuanto se llama stop()
+            if self._stop_evt.wait(rest):
+                break
 
     # ---- Helpers de emparejamiento ----
-    def _collect_candidates(self, y: int, eligibles: List[str]) -> List[Tuple[float, str, str]]:
-        """Devuelve lista (score, a_id, b_id) para parejas M-F elegibles y seguras."""
-        cand: List[Tuple[float, str, str]] = []
-        n = len(eligibles)
-        for i in range(n):
-            a_id = eligibles[i]
-            A = self.personas[a_id]
-            ga = _norm_gender(A.get("genero", ""))
-            if not ga:
-                continue
-            for j in range(i + 1, n):
-                b_id = eligibles[j]
-                B = self.personas[b_id]
-                gb = _norm_gender(B.get("genero", ""))
-                if not gb or ga == gb:
-                    continue
-                ea = _age_of(A, y); eb = _age_of(B, y)
-                if ea is None or eb is None or abs(ea - eb) > 15:
-                    continue
-                if not _genetically_safe(self.personas, A, B, a_id, b_id):
-                    continue
-                score = _compute_compatibility(A, B)
-                if score >= self.umbral:
-                    cand.append((score, a_id, b_id))
-        cand.sort(key=lambda t: t[0], reverse=True)
-        return cand
+    def _get_parsed(self, ced: str) -> Dict[str, Any]:
+        """
+        Campos que no cambian tick a tick (género, padres, afinidades, provincia, familia),
+        parseados una sola vez. Familia y provincia quedan como códigos enteros (0 = vacío)
+        y las afinidades como máscara de bits. Edad, fallecimiento y estado civil NO se
+        cachean: los actualizan otros motores. _make_union invalida a los dos involucrados.
+        """
+        pc = self._pcache.get(ced)
+        if pc is None:
+            p = self.personas[ced]
+            tables = self._intern
+            parents = _parents_of(p)
+            ceds = tables["ced"]
+            pc = self._pcache[ced] = {
+                "gender": _norm_gender(p.get("genero", "")),
+                "parents": parents,
+                # cédula y padres como enteros (0 = vacío) para el cruce de candidatos
+                "id": _intern(ceds, ced),
+                "parents_id": (_intern(ceds, parents[0]), _intern(ceds, parents[1])),
+                "aff": _aff_mask(_list_from_csv(p.get("afinidades") or p.get("intereses")), tables["aff"]),
+                "prov": _intern(tables["prov"], p.get("provincia")),
+                "familia": _intern(tables["familia"], _id_or_empty(p.get("familia"))),
+            }
+        return pc
+
+    def _kin_parents(self, a_id: str, b_id: str) -> Dict[str, Tuple[str, str]]:
+        """
+        Tabla de padres mínima para _genetically_safe_tbl sobre a y b: ellos y sus padres
+        (los abuelos solo se comparan por id). Sale de la caché de parseo, sin volver a
+        partir los textos "cedula - nombre".
+        """
+        personas = self.personas
+        table: Dict[str, Tuple[str, str]] = {}
+        for ced in (a_id, b_id):
+            table[ced] = self._get_parsed(ced)["parents"] if ced in personas else _NO_PARENTS
+        for ced in [x for pair in list(table.values()) for x in pair if x]:
+            if ced not in table:
+                table[ced] = self._get_parsed(ced)["parents"] if ced in personas else _NO_PARENTS
+        return table
+
+    def _collect_candidates(self, y: int, eligibles: List[Eligible]) -> _Ranking:
+        """Devuelve los (score, a_id, b_id) de parejas M-F elegibles y seguras, mejor primero."""
+        # Proyección única por persona (género, edad, rasgos de compatibilidad);
+        # solo se cruzan hombres con mujeres. El reloj se lee una vez por tick.
+        year_now = datetime.now().year
+        males: List[tuple] = []
+        females: List[tuple] = []
+        personas = self.personas
+        for i, (ced, age, pc) in enumerate(eligibles):
+            # La edad "de hoy" solo difiere de la simulada si sale de la fecha de nacimiento
+            age_now = age if year_now == y else (_age_of(personas[ced], year_now) or 0)
+            aff = pc["aff"]
+            row = (i, ced, age, aff, bin(aff).count("1"), age_now, pc["prov"], pc["id"])
+            (males if pc["gender"] == "M" else females).append(row)
+
+        # Padres de todos una sola vez, por id entero; ancestros bajo demanda (memo por llamada).
+        # list() copia las claves de una vez: Nacimientos inserta desde su hilo sin este lock.
+        get_parsed = self._get_parsed
+        parents = {pc["id"]: pc["parents_id"] for pc in map(get_parsed, list(self.personas))}
+
+        # Mujeres ordenadas por edad: cada hombre solo recorre su ventana de ±15 años
+        females.sort(key=lambda t: t[2])
+        # Mayor score primero; empates en el orden original de los pares
+        return _Ranking(_scan_pairs(males, females, parents, {}, self.umbral))
 
     # ---- Lógica por tick ----
-    def _tick(self):
-        with self._lock:
-            # avanza el año si no hay callback externo
-            self._anio_sim = int(self.get_anio_sim()) if self.get_anio_sim else (self._anio_sim + 1)
-            y = self._anio_sim
-
-            # --- chequeo mínimo 1/2 años: si dos años previos tuvieron 0, forzamos en este ---
-            y_prev1, y_prev2 = y - 1, y - 2
-            if self.min_uniones_2y > 0:
-                if self._unions_by_year.get(y_prev1, 0) == 0 and self._unions_by_year.get(y_prev2, 0) == 0:
-                    self._force_minimum_union(y)
-                    # si ya alcanzamos el tope tras forzar, salir
-                    if self._unions_by_year.get(y, 0) >= self.max_uniones:
-                        return
+    def _tick(self) -> bool:
+        """Un tick de uniones; True si se concretó alguna."""
+        # Cálculo (elegibles + candidatos, lo caro) sin lock; _make_union lo toma al mutar
+        plan = self._plan_tick()
+        changed = False
+        if plan is not None:
+            try:
+                changed = self._apply_tick(*plan)
+            finally:
+                self._flush_persist()
+        # Callback de la UI fuera del lock: una UI lenta no frena la simulación
+        if self.on_event:
+            self.drain_events(self.on_event)
+        return changed
 
-            # si alcanzamos el tope del año, nada
-            if self._unions_by_year.get(y, 0) >= self.max_uniones:
-                return
+    def _emit(self, tipo: str, payload: Dict):
+        """Encola un evento; si la cola está llena se descarta (prioriza tiempo real)."""
+        try:
+            self._evt_q.put_nowait((tipo, payload))
+        except queue.Full:
+            pass
 
-            # construir lista de solteros elegibles
-            eligibles = self._eligible_singles(y)
-            if not eligibles:
-                return
+    def drain_events(self, handler: Callable[[str, Dict], None]) -> int:
+        """Entrega a `handler` los eventos pendientes, en orden. Devuelve cuántos hubo."""
+        n = 0
+        while True:
+            try:
+                tipo, payload = self._evt_q.get_nowait()
+            except queue.Empty:
+                return n
+            n += 1
+            try:
+                handler(tipo, payload)
+            except Exception:
+                pass
 
-            # candidatos por compatibilidad
-            candidates = self._collect_candidates(y, eligibles)
-            if not candidates:
-                return
+    def _plan_tick(self) -> Optional[Tuple[int, _Ranking]]:
+        """(año, candidatos) del tick, o None si este tick no hay nada que unir."""
+        # avanza el año si no hay callback externo
+        self._anio_sim = int(self.get_anio_sim()) if self.get_anio_sim else (self._anio_sim + 1)
+        y = self._anio_sim
+
+        # si alcanzamos el tope del año, nada (tampoco se fuerza)
+        if self._unions_by_year.get(y, 0) >= self.max_uniones:
+            return None
+
+        # construir lista de solteros elegibles
+        eligibles = self._eligible_singles(y)
+        if not eligibles:
+            return None
 
-            made_any_this_tick = False
-            used: set = set()
+        # mismo año y mismos elegibles (y edades) que un tick sin candidatos: no se repite el cruce
+        key = (y, tuple((ced, age) for ced, age, _pc in eligibles))
+        if key == self._barren_key:
+            return None
 
-            for score, a_id, b_id in candidates:
+        # candidatos por compatibilidad (una sola vez: también los usa la unión forzada)
+        candidates = self._collect_candidates(y, eligibles)
+        if not candidates:
+            self._barren_key = key
+            return None
+        return y, candidates
+
+    def _apply_tick(self, y: int, candidates: _Ranking) -> bool:
+        """Concreta las uniones del tick; _make_union revalida a cada pareja bajo el lock.
+        Devuelve True si hubo al menos una (forzada incluida)."""
+        made_any_this_tick = False
+        used: set = set()
+
+        # --- chequeo mínimo 1/2 años: si dos años previos tuvieron 0, forzamos en este ---
+        y_prev1, y_prev2 = y - 1, y - 2
+        if self.min_uniones_2y > 0:
+            if self._unions_by_year.get(y_prev1, 0) == 0 and self._unions_by_year.get(y_prev2, 0) == 0:
+                forced = self._force_minimum_union(y, candidates)
+                if forced:
+                    used.update(forced)
+                # si ya alcanzamos el tope tras forzar, salir
                 if self._unions_by_year.get(y, 0) >= self.max_uniones:
-                    break
-                if a_id in used or b_id in used:
-                    continue
-                if random.random() > self.p_union:
-                    continue
-                if self._make_union(a_id, b_id, y, score, forced=False):
-                    used.add(a_id); used.add(b_id)
-                    self._unions_by_year[y] = self._unions_by_year.get(y, 0) + 1
-                    made_any_this_tick = True
+                    return bool(used)
+        # Sorteo perezoso (solo para pares que llegan a sortearse); con p=1 no hace falta
+        rnd = random.random if self.p_union < 1.0 else None
+        p_union = self.p_union
 
-            # rescate suave si no se logró ninguna
-            if not made_any_this_tick and self._unions_by_year.get(y, 0) < self.max_uniones:
-                best = candidates[0]
-                if self._make_union(best[1], best[2], y, best[0], forced=False):
-                    self._unions_by_year[y] = self._unions_by_year.get(y, 0) + 1
+        for score, a_id, b_id in candidates:
+            if self._unions_by_year.get(y, 0) >= self.max_uniones:
+                break
+            if a_id in used or b_id in used:
+                continue
+            if rnd is not None and rnd() > p_union:
+                continue
+            if self._make_union(a_id, b_id, y, score, forced=False):
+                used.add(a_id); used.add(b_id)
+                self._unions_by_year[y] = self._unions_by_year.get(y, 0) + 1
+                made_any_this_tick = True
+
+        # rescate suave si no se logró ninguna (sin repetir a los de la unión forzada)
+        if not made_any_this_tick and self._unions_by_year.get(y, 0) < self.max_uniones:
+            best = next((c for c in candidates if c[1] not in used and c[2] not in used), None)
+            if best and self._make_union(best[1], best[2], y, best[0], forced=False):
+                self._unions_by_year[y] = self._unions_by_year.get(y, 0) + 1
+                return True
+        # `used` reúne a los unidos del tick (forzada y sorteadas)
+        return bool(used)
 
     # ---- Elegibles ----
-    def _eligible_singles(self, year_now: int) -> List[str]:
-        out: List[str] = []
-        for ced, p in list(self.personas.items()):
-            if _is_dead(p, year_now):
+    def _eligible_singles(self, year_now: int) -> List[Eligible]:
+        cache = self._elig_cache
+        if cache is None or cache[0] != year_now or self._elig_dirty or self._elig_ticks >= _ELIG_RESCAN_TICKS:
+            self._elig_dirty = False
+            # Recorrido completo, sin copiar items(). Nacimientos inserta desde su hilo
+            # (con su propio lock): si el dict cambia a mitad, se repite sobre una copia.
+            try:
+                out = self._scan_eligibles(self.personas.items(), year_now)
+            except RuntimeError:
+                out = self._scan_eligibles(list(self.personas.items()), year_now)
+            self._elig_ticks = 0
+        else:
+            # Mismo año: solo se revalida a los ya elegibles (muertes, uniones, cambios
+            # de otros motores). Los que cumplen 18 entran en el próximo recorrido completo.
+            personas = self.personas
+            out = self._scan_eligibles(((e[0], personas[e[0]]) for e in cache[1] if e[0] in personas), year_now)
+            self._elig_ticks += 1
+        self._elig_cache = (year_now, out)
+        return out
+
+    def _scan_eligibles(self, items, year_now: int) -> List[Eligible]:
+        # Alias locales: evitan búsquedas globales en el bucle caliente
+        is_dead = _is_dead
+        age_of = _age_of
+        is_single = _is_single
+        get_parsed = self._get_parsed
+        out: List[Eligible] = []
+        append = out.append
+        for ced, p in items:
+            if is_dead(p, year_now):
                 continue
-            age = _age_of(p, year_now)
+            age = age_of(p, year_now)
             if age is None or age < 18:
                 continue
-            if not _is_single(p):
+            if not is_single(p):
                 continue
+            pc = get_parsed(ced)
             # Debe tener familia asignada (para cruzar si aplica)
-            fam = _id_or_empty(p.get("familia"))
-            if not fam:
+            if not pc["familia"]:
                 continue
             # Género reconocido
-            if not _norm_gender(p.get("genero","")):
+            if not pc["gender"]:
                 continue
-            out.append(ced)
+            append((ced, age, pc))
         return out
 
     # ---- Forzar 1 unión por regla de mínimo 1/2 años ----
-    def _force_minimum_union(self, y: int):
-        """Forzar al menos una unión este año si los 2 previos tuvieron 0 y hay elegibles."""
+    def _force_minimum_union(self, y: int, candidates: Optional[_Ranking] = None) -> Optional[Tuple[str, str]]:
+        """
+        Forzar al menos una unión este año si los 2 previos tuvieron 0 y hay elegibles.
+        `candidates` permite reusar la lista ya calculada en el tick. Devuelve el par unido.
+        """
         if self._unions_by_year.get(y, 0) >= self.max_uniones:
-            return
-        eligibles = self._eligible_singles(y)
-        if not eligibles:
-            return
-        candidates = self._collect_candidates(y, eligibles)
+            return None
+        if candidates is None:
+            eligibles = self._eligible_singles(y)
+            if not eligibles:
+                return None
+            candidates = self._collect_candidates(y, eligibles)
         if not candidates:
-            return
+            return None
         best = candidates[0]
         if self._make_union(best[1], best[2], y, best[0], forced=True):
             self._unions_by_year[y] = self._unions_by_year.get(y, 0) + 1
-            if self.on_event:
-                try:
-                    self.on_event("union_min_2y", {"cedula": best[1], "detalle": "Se fuerza unión por regla de mínimo 1 cada 2 años"})
-                except Exception:
-                    pass
+            self._emit("union_min_2y", {"cedula": best[1], "detalle": "Se fuerza unión por regla de mínimo 1 cada 2 años"})
+            return best[1], best[2]
+        return None
 
     # ---- Persistencia TXT ----
-    def _persist_union_to_txt(self, A: Persona, B: Persona):
-        """Escribe la pareja en el TXT si se configuró personas_file."""
-        if not self.personas_file:
-            return
+    def _txt_state(self):
+        """Contenido indexado del TXT; se relee solo si cambió en disco desde la última vez."""
         path = self.personas_file
-        if not os.path.exists(path):
+        st = os.stat(path)
+        sig = (st.st_mtime_ns, st.st_size)
+        if self._txt_cache is None or self._txt_cache[0] != sig:
+            with io.open(path, "rb") as f:
+                data = f.read()
+            lines = data.decode(self._encoding).splitlines(keepends=True)
+            sep, idx = self.txt_schema.sep, self.txt_schema.persona_id_idx
+            by_id: Dict[str, List[int]] = {}
+            offsets: List[int] = []
+            pos = 0
+            for i, raw in enumerate(lines):
+                offsets.append(pos)
+                pos += len(raw.encode(self._encoding))
+                parts = raw.split(sep, idx + 1)
+                if len(parts) > idx:
+                    by_id.setdefault(parts[idx].strip(), []).append(i)
+            self._txt_cache = (sig, lines, by_id, offsets)
+        return self._txt_cache
+
+    def _persist_union_to_txt(self, A: Persona, B: Persona):
+        """Encola la pareja para el TXT; se escribe en _flush_persist al cerrar el tick."""
+        if self.personas_file:
+            self._pending_persist.append((_txt_snapshot(A), _txt_snapshot(B)))
+
+    def _flush_persist(self):
+        """Entrega las uniones del tick al escritor (o las escribe aquí si no hay hilo)."""
+        pending, self._pending_persist = self._pending_persist, []
+        if not pending:
             return
-        try:
-            with io.open(path, "r", encoding=self._encoding) as f:
-                lines = f.readlines()
+        # Ya detenido: se escribe en este hilo (stop() pudo vaciar la cola antes)
+        if self._io_thr is not None and self._io_thr.is_alive() and not self._stop_evt.is_set():
+            self._io_q.put(pending)
+        else:
+            self._write_pending(pending)
 
+    def _io_loop(self):
+        """Hilo escritor: junta los lotes encolados y los aplica al TXT de una vez."""
+        while True:
+            try:
+                batch = self._io_q.get(timeout=0.5)
+            except queue.Empty:
+                # Termina cuando el motor ya se detuvo; lo que quede se escribe antes de salir
+                if self._stop_evt.is_set() and not (self._thr and self._thr.is_alive()):
+                    batch = self._drain_io([])
+                    if batch:
+                        self._write_pending(batch)
+                    return
+                continue
+            self._write_pending(self._drain_io(batch))
+
+    def _drain_io(self, batch: List[Tuple[Persona, Persona]]) -> List[Tuple[Persona, Persona]]:
+        while True:
+            try:
+                batch.extend(self._io_q.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _write_pending(self, pending: List[Tuple[Persona, Persona]]):
+        """Aplica un lote de uniones al TXT con una sola escritura."""
+        with self._io_lock:
+            path = self.personas_file
+            if not path or not os.path.exists(path):
+                return
+            try:
+                sig, lines, by_id, offsets = self._txt_state()
+                changed = self._apply_pending(lines, by_id, pending)
+                if not changed:
+                    return
+
+                enc = self._encoding
+                if all(len(lines[i].encode(enc)) == len(old.encode(enc)) for i, old in changed.items()):
+                    # Mismo largo en bytes: se sobrescriben solo esas líneas, si el archivo
+                    # abierto sigue siendo el que se indexó (otro escritor pudo reescribirlo)
+                    with io.open(path, "r+b") as f:
+                        st = os.fstat(f.fileno())
+                        if (st.st_mtime_ns, st.st_size) == sig:
+                            for i in changed:
+                                f.seek(offsets[i])
+                                f.write(lines[i].encode(enc))
+                            f.flush()
+                            st = os.fstat(f.fileno())
+                            self._txt_cache = ((st.st_mtime_ns, st.st_size), lines, by_id, offsets)
+                            return
+                    # Cambió en disco: las líneas en caché ya no valen; se relee y se reaplica
+                    self._txt_cache = None
+                    _sig, lines, by_id, _offsets = self._txt_state()
+                    if not self._apply_pending(lines, by_id, pending):
+                        return
+                if self._file_mode is None:
+                    self._file_mode = stat.S_IMODE(os.stat(path).st_mode)
+                _atomic_write(path, "".join(lines), encoding=enc, mode=self._file_mode)
+                self._txt_cache = None
+            except Exception:
+                # No rompe la simulación si falla el I/O
+                self._txt_cache = None
+
+    def _apply_pending(self, lines: List[str], by_id: Dict[str, List[int]],
+                       pending: List[Tuple[Persona, Persona]]) -> Dict[int, str]:
+        """Pone la pareja de cada unión del lote en `lines`; devuelve {nº de línea: texto anterior}."""
+        changed: Dict[int, str] = {}
+        for A, B in pending:
             pareja_A = _idname(str(B.get("cedula") or ""), str(B.get("nombre","")))
             pareja_B = _idname(str(A.get("cedula") or ""), str(A.get("nombre","")))
-
-            _update_pareja_in_lines(lines, self.txt_schema, A, pareja_A)
-            _update_pareja_in_lines(lines, self.txt_schema, B, pareja_B)
-
-            _atomic_write(path, "".join(lines), encoding=self._encoding)
-        except Exception:
-            # No rompe la simulación si falla el I/O
-            pass
+            for P, text in ((A, pareja_A), (B, pareja_B)):
+                pid = str(P.get("cedula") or P.get("id") or "").strip()
+                i = _find_persona_line(lines, self.txt_schema, P, by_id.get(pid))
+                if i is None:
+                    continue
+                changed.setdefault(i, lines[i])
+                lines[i] = _with_pareja(lines[i], self.txt_schema, text)
+        return changed
 
     # ---- Crear unión ----
     def _make_union(self, a_id: str, b_id: str, year_now: int, score: float, forced: bool = False) -> bool:
@@ -551,34 +912,48 @@ class UnionsEngine:
         if not forced and self._unions_by_year.get(year_now, 0) >= self.max_uniones:
             return False
 
-        A = self.personas.get(a_id)
-        B = self.personas.get(b_id)
-        if not A or not B:
-            return False
-
-        # verificación final anti-incesto
-        if not _genetically_safe(self.personas, A, B, a_id, b_id):
-            return False
-
-        # 1) Actualiza 'pareja' de ambos con el formato "cedula - nombre"
-        A["pareja"] = _idname(b_id, B.get("nombre", ""))
-        B["pareja"] = _idname(a_id, A.get("nombre", ""))
-
-        # 2) Estado civil visible para que el tree los considere pareja
-        A["estado"] = "Unión libre"
-        B["estado"] = "Unión libre"
-
-        # 3) Si son de familias distintas, agrégalos a 'familias_extra'
-        fam_a = str(A.get("familia") or "").strip()
-        fam_b = str(B.get("familia") or "").strip()
-        if fam_a and fam_b and fam_a != fam_b:
-            for P, fam_other in ((A, fam_b), (B, fam_a)):
-                extras = P.get("familias_extra")
-                if not isinstance(extras, list):
-                    extras = []
-                if fam_other not in extras:
-                    extras.append(fam_other)
-                P["familias_extra"] = extras
+        # Solo la verificación y la mutación de personas van bajo el lock
+        with self._lock:
+            A = self.personas.get(a_id)
+            B = self.personas.get(b_id)
+            if not A or not B:
+                return False
+
+            # los candidatos se calcularon fuera del lock: otro motor pudo cambiarlos
+            if not (_is_single(A) and _is_single(B)) or _is_dead(A, year_now) or _is_dead(B, year_now):
+                return False
+
+            # verificación final anti-incesto
+            if not _genetically_safe_tbl(self._kin_parents(a_id, b_id), {}, a_id, b_id):
+                return False
+
+            # Sus datos cambian (familias_extra, pareja): parseo nuevo la próxima vez
+            self._pcache.pop(a_id, None)
+            self._pcache.pop(b_id, None)
+
+            # 1) Actualiza 'pareja' de ambos con el formato "cedula - nombre"
+            A["pareja"] = _idname(b_id, B.get("nombre", ""))
+            B["pareja"] = _idname(a_id, A.get("nombre", ""))
+            A["pareja_id"] = b_id
+            B["pareja_id"] = a_id
+
+            # 2) Estado civil visible para que el tree los considere pareja
+            A["estado"] = "Unión libre"
+            B["estado"] = "Unión libre"
+
+            # 3) Si son de familias distintas, agrégalos a 'familias_extra'
+            #    (set: pertenencia O(1); los lectores solo hacen `familia in extras`)
+            fam_a = str(A.get("familia") or "").strip()
+            fam_b = str(B.get("familia") or "").strip()
+            if fam_a and fam_b and fam_a != fam_b:
+                for P, fam_other in ((A, fam_b), (B, fam_a)):
+                    extras = P.get("familias_extra")
+                    if isinstance(extras, list):
+                        extras = set(extras)
+                    elif not isinstance(extras, set):
+                        extras = set()
+                    extras.add(fam_other)
+                    P["familias_extra"] = extras
 
         # 4) Historial (sidecar)
         try:
@@ -589,17 +964,17 @@ class UnionsEngine:
             # No rompemos si el historial no está disponible
             pass
 
-        # 5) Evento visual
-        if self.on_event:
-            detalle = f"{A.get('nombre','¿?')} y {B.get('nombre','¿?')} se unieron (compatibilidad: {int(round(score*100))}%){' [forzada]' if forced else ''}"
-            try:
-                self.on_event("union", {"cedula": a_id, "detalle": detalle})
-            except Exception:
-                pass
-            try:
-                self.on_event("union", {"cedula": b_id, "detalle": detalle})
-            except Exception:
-                pass
+        # 5) Evento visual, uno por pareja (se despacha al terminar el tick, fuera del lock)
+        detalle = f"{A.get('nombre','¿?')} y {B.get('nombre','¿?')} se unieron (compatibilidad: {int(round(score*100))}%){' [forzada]' if forced else ''}"
+        self._emit("union", {
+            "cedula": a_id,
+            "cedulas": [a_id, b_id],
+            "nombre": A.get("nombre", "¿?"),
+            "a_nombre": A.get("nombre", ""),
+            "b_nombre": B.get("nombre", ""),
+            "score": score,
+            "detalle": detalle,
+        })
 
         # 6) Persistir al TXT si procede
         #   Requisitos: cada Persona debe tener:
@@ -607,11 +982,5 @@ class UnionsEngine:
         #     - "cedula" (o "id"): "001", "002", ...
         self._persist_union_to_txt(A, B)
 
-        # 7) Refrescar UI
-        if self.on_change:
-            try:
-                self.on_change()
-            except Exception:
-                pass
-
+        # 7) La UI se refresca una vez por tick (ver _run), no por unión
         return True